@@ -1,4 +1,4 @@
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import Flask, render_template, jsonify, request, send_file, send_from_directory
 import subprocess
 import requests
 import json
@@ -63,18 +63,19 @@ def play_tts_sync(text, voice):
     except Exception as e:
         print(f"TTS Error: {e}")
 
-# MQTT callback for person detection
+# SCC publishes its deduplicated, rule-evaluated decisions here (sinks.mqtt in the SCC config)
+SCC_DECISIONS_TOPIC = os.environ.get('SCC_DECISIONS_TOPIC', 'scc/decisions')
+
+# MQTT callback for gate decisions
 def on_message(client, userdata, msg):
     try:
-        payload = json.loads(msg.payload.decode())
-        
-        # Check if it's a new person event on gate cameras
-        if payload.get('type') == 'new' and payload.get('after', {}).get('label') == 'person':
-            camera = payload.get('after', {}).get('camera', '')
-            
-            if camera in ['front_gate', 'signpost']:
-                # Play announcement in background thread
-                threading.Thread(target=play_tts_sync, args=("Someone is at the gate", GLITCH_VOICE)).start()
+        decision = json.loads(msg.payload)
+
+        # SCC rules decide when to announce (once per object); "announcement" says which one
+        if 'announce' not in (decision.get('actions') or ()) or decision.get('announcement') != 'gate':
+            return
+        # Play announcement in background thread
+        threading.Thread(target=play_tts_sync, args=("Someone is at the gate", GLITCH_VOICE)).start()
     except Exception as e:
         print(f"MQTT Error: {e}")
 
@@ -82,10 +83,11 @@ def on_message(client, userdata, msg):
 def start_mqtt_listener():
     client = mqtt.Client()
     client.on_message = on_message
-    
+    # Resubscribe after reconnects
+    client.on_connect = lambda client, userdata, flags, rc: client.subscribe(SCC_DECISIONS_TOPIC)
+
     try:
         client.connect("127.0.0.1", 1883, 60)
-        client.subscribe("frigate/events")
         client.loop_forever()
     except Exception as e:
         print(f"MQTT Connection Error: {e}")
@@ -264,6 +266,64 @@ def update_frigate_detection(mode):
         traceback.print_exc()
         return False
 
+# SCC decision history (served by run_scc over a Unix socket)
+SCC_API_SOCKET = os.path.expanduser(os.environ.get('SCC_API_SOCKET', '~/.local/state/scc/api.sock'))
+
+def query_scc_decisions(query):
+    """Send one query to the SCC decision API and return the parsed response."""
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(2)
+        sock.connect(SCC_API_SOCKET)
+        sock.sendall(json.dumps(query).encode() + b'\n')
+        response = b''
+        while not response.endswith(b'\n'):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+    return json.loads(response)
+
+@app.route('/api/decisions')
+def get_decisions():
+    query = {}
+    for key in ('camera_id', 'event_type', 'cursor'):
+        if request.args.get(key):
+            query[key] = request.args[key]
+    try:
+        for key in ('start', 'end'):
+            if request.args.get(key):
+                query[key] = float(request.args[key])
+        if request.args.get('since_minutes'):
+            query['start'] = datetime.now().timestamp() - float(request.args['since_minutes']) * 60
+        query['limit'] = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({'error': 'Invalid numeric parameter'}), 400
+
+    try:
+        result = query_scc_decisions(query)
+    except (OSError, ValueError) as e:
+        return jsonify({'error': f'SCC decision API unavailable: {e}'}), 503
+    if 'error' in result:
+        return jsonify(result), 400
+    return jsonify(result)
+
+@app.route('/api/decisions/<event_id>/snapshot.jpg')
+def get_decision_snapshot(event_id):
+    """Serve a decision's Frigate snapshot from the SCC snapshot cache."""
+    try:
+        result = query_scc_decisions({'snapshot': event_id})
+    except (OSError, ValueError) as e:
+        return jsonify({'error': f'SCC decision API unavailable: {e}'}), 503
+    if 'error' in result:
+        return jsonify(result), 404
+    try:
+        # Short max_age: SCC refetches while Frigate improves the snapshot
+        return send_file(result['path'], mimetype='image/jpeg', max_age=60)
+    except OSError:
+        # Evicted from the cache since the lookup
+        return jsonify({'error': f'No cached snapshot for {event_id!r}'}), 404
+
 @app.route('/api/glitch/status')
 def glitch_status():
     result = subprocess.run(['systemctl', 'is-active', 'glitch-voice'], capture_output=True, text=True)
@@ -2,28 +2,23 @@
 import paho.mqtt.client as mqtt
 import os
 import subprocess
-import time
 import json
 from datetime import datetime
 
 MQTT_HOST = "localhost"
 MQTT_PORT = 1883
+# Deduplicated, rule-evaluated decisions published by SCC (sinks.mqtt in the SCC config)
+DECISIONS_TOPIC = os.environ.get("SCC_DECISIONS_TOPIC", "scc/decisions")
 GLITCH_VOICE = "en-AU-NatashaNeural"
 
-# Cameras to monitor for greetings
-GREETING_CAMERAS = ["facetag"]
-
-# Track recent announcements to avoid spam
-last_announcement = {}
-COOLDOWN_SECONDS = 300  # 5 minutes between greetings
+# Pre-generated greetings per camera (without the SCC site prefix)
+GREETING_AUDIO = {
+    "facetag": "/srv/scc-ui/greeting_ross.mp3"
+}
 
 def speak_greeting(camera):
     """Use Glitch voice to announce (pre-generated audio)"""
-    audio_files = {
-        "facetag": "/srv/scc-ui/greeting_ross.mp3"
-    }
-    
-    audio_file = audio_files.get(camera)
+    audio_file = GREETING_AUDIO.get(camera.rpartition(':')[2])
     
     if audio_file and os.path.exists(audio_file):
         try:
@@ -37,40 +32,30 @@ def speak_greeting(camera):
 
 def on_connect(client, userdata, flags, rc):
     print(f"Connected to MQTT broker with result code {rc}")
-    # Subscribe to Frigate events
-    client.subscribe("frigate/events")
-    print("Subscribed to frigate/events")
+    # Subscribe to SCC decisions; dedupe and rules happen in SCC
+    client.subscribe(DECISIONS_TOPIC)
+    print(f"Subscribed to {DECISIONS_TOPIC}")
 
 def on_message(client, userdata, msg):
     try:
-        payload = json.loads(msg.payload.decode())
-        
-        # Debug: show all events
-        event_type = payload.get('type')
-        label = payload.get('after', {}).get('label')
-        camera = payload.get('after', {}).get('camera', '')
-        print(f"[DEBUG] Event: type={event_type}, label={label}, camera={camera}")
-        
-        # Check if it's a new person event
-        if payload.get('type') == 'new' and payload.get('after', {}).get('label') == 'person':
-            camera = payload.get('after', {}).get('camera', '')
-            
-            if camera in GREETING_CAMERAS:
-                # Check cooldown
-                now = time.time()
-                if camera not in last_announcement or (now - last_announcement[camera]) > COOLDOWN_SECONDS:
-                    print(f"[{datetime.now()}] Person detected on {camera}, announcing...")
-                    speak_greeting(camera)
-                    last_announcement[camera] = now
-                else:
-                    print(f"[{datetime.now()}] Person on {camera} (cooldown active)")
-                    
+        decision = json.loads(msg.payload)
+
+        camera = decision.get('camera_id', '')
+        event_type = decision.get('event_type')
+        actions = decision.get('actions')
+        print(f"[DEBUG] Decision: event_type={event_type}, camera={camera}, actions={actions}")
+
+        # SCC rules decide when to greet (once per object, with the cooldown); "announcement" says which one
+        if 'announce' in (actions or ()) and decision.get('announcement') == 'greeting':
+            print(f"[{datetime.now()}] Person detected on {camera}, announcing...")
+            speak_greeting(camera)
+
     except Exception as e:
         print(f"Message processing error: {e}")
 
 def main():
     print("🎤 Frigate Announcement Service Starting...")
-    print(f"Monitoring cameras: {', '.join(GREETING_CAMERAS)}")
+    print(f"Greeting cameras: {', '.join(GREETING_AUDIO)}")
     
     client = mqtt.Client()
     client.on_connect = on_connect
@@ -1,3 +1,3 @@
 """Scrapyard Command Center core utilities."""
 
-__all__ = ["events", "dedupe", "adapters"]
+__all__ = ["events", "dedupe", "adapters", "lifecycle", "state", "journal"]
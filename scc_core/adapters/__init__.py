@@ -1,5 +1,16 @@
 """Event adapter implementations."""
 
-from .frigate_mqtt import FrigateMqttAdapter, MqttConfig
+from .frigate_mqtt import FrigateMqttAdapter, MqttConfig, run_adapters
+from .frigate_mqtt_async import AsyncFrigateMqttAdapter
+from .transport import InMemoryBroker, InMemoryTransport, MqttTransport, paho_transport
 
-__all__ = ["FrigateMqttAdapter", "MqttConfig"]
+__all__ = [
+    "AsyncFrigateMqttAdapter",
+    "FrigateMqttAdapter",
+    "InMemoryBroker",
+    "InMemoryTransport",
+    "MqttConfig",
+    "MqttTransport",
+    "paho_transport",
+    "run_adapters",
+]
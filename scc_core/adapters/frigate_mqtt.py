@@ -5,11 +5,16 @@ import logging
 from dataclasses import dataclass
 from datetime import datetime, timezone
 import threading
-from typing import Any, Callable, Dict, Optional
+import time
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional
 
 import paho.mqtt.client as mqtt
 
-from scc_core.events import Event
+from scc_core.adapters.transport import MqttTransport, TransportFactory, paho_transport
+from scc_core.events import AnyEvent, CompactEvent, Event
+from scc_core.metrics import SccMetrics
+from scc_core.profiling import StageProfiler
+from scc_core.workqueue import EventWorkQueue, QueueConfig
 
 logger = logging.getLogger(__name__)
 
@@ -22,37 +27,96 @@ class MqttConfig:
     password: Optional[str] = None
     topic: str = "frigate/events"
     client_id: Optional[str] = None
+    # Federation: connection name for metrics/logs, and a prefix that namespaces camera ids per site.
+    site: str = "default"
+    camera_prefix: str = ""
+
+
+def run_adapters(
+    adapters: "List[FrigateMqttAdapter]",
+    on_event: Callable[[AnyEvent], None],
+    stop_event: threading.Event,
+) -> None:
+    """Run each adapter's blocking ``start`` on its own thread until ``stop_event`` is set.
+
+    Every adapter keeps its own paho network loop, so a slow or unreachable
+    broker never stalls the others.
+    """
+
+    if len(adapters) == 1:
+        adapters[0].start(on_event=on_event, stop_event=stop_event)
+        return
+    threads = [
+        threading.Thread(
+            target=adapter.start,
+            kwargs={"on_event": on_event, "stop_event": stop_event},
+            name=f"scc-mqtt-{adapter._config.site}",
+        )
+        for adapter in adapters
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
 
 
 class FrigateMqttAdapter:
     """MQTT adapter that normalizes Frigate events into SCC incidents."""
 
-    def __init__(self, mqtt_config: MqttConfig):
+    def __init__(
+        self,
+        mqtt_config: MqttConfig,
+        queue_config: Optional[QueueConfig] = None,
+        compact_events: bool = False,
+        cameras: Optional[Iterable[str]] = None,
+        labels: Optional[Iterable[str]] = None,
+        metrics: Optional[SccMetrics] = None,
+        profiler: Optional[StageProfiler] = None,
+        transport: Optional[TransportFactory] = None,
+    ):
         self._config = mqtt_config
-        self._client = mqtt.Client(client_id=self._config.client_id)
-        if self._config.username:
-            self._client.username_pw_set(self._config.username, self._config.password)
-
-        self._client.on_connect = self._on_connect
-        self._client.on_message = self._on_message
-        self._client.on_disconnect = self._on_disconnect
-        self._client.reconnect_delay_set(min_delay=1, max_delay=30)
+        # Builds the MQTT client; paho by default, or e.g. ``InMemoryBroker.transport``.
+        self._transport = transport or paho_transport
+        self._metrics = metrics
+        self._profiler = profiler
+        self._compact_events = compact_events
+        # Allowlists; None accepts everything.
+        self._cameras: Optional[FrozenSet[str]] = None
+        self._labels: Optional[FrozenSet[str]] = None
+        self.set_filters(cameras, labels)
+        self.rejected_messages = 0
+        self._queue_config = queue_config
+        self._queue: Optional[EventWorkQueue] = None
+        self.connected = False
+        self._client = self._new_client()
 
-        self._on_event: Optional[Callable[[Event], None]] = None
+        self._on_event: Optional[Callable[[AnyEvent], None]] = None
         self._stop_event: Optional[threading.Event] = None
 
-    def start(self, on_event: Callable[[Event], None], stop_event: threading.Event) -> None:
+    def start(self, on_event: Callable[[AnyEvent], None], stop_event: threading.Event) -> None:
         """Start consuming MQTT events and forward them through the callback."""
 
         self._on_event = on_event
         self._stop_event = stop_event
+        if self._queue_config is not None:
+            # Callbacks run on worker threads so a slow consumer never stalls paho's network loop.
+            self._queue = EventWorkQueue(self._handle_event, self._queue_config)
+            self._queue.start()
 
         logger.info(
             "Starting Frigate MQTT adapter",
-            extra={"topic": self._config.topic, "host": self._config.host, "port": self._config.port},
+            extra={
+                "site": self._config.site,
+                "topic": self._config.topic,
+                "host": self._config.host,
+                "port": self._config.port,
+            },
         )
         try:
             self._client.connect(self._config.host, self._config.port)
+        except OSError:
+            # The network loop keeps retrying, so one unreachable broker does not stop the others.
+            logger.warning("MQTT broker unreachable; retrying", extra={"site": self._config.site})
         except Exception:  # noqa: BLE001
             logger.exception("Failed to connect to MQTT broker")
             raise
@@ -65,42 +129,129 @@ class FrigateMqttAdapter:
             logger.info("Stopping Frigate MQTT adapter")
             self._client.disconnect()
             self._client.loop_stop()
+            if self._queue is not None:
+                self._queue.close()
+                logger.info("Event queue drained", extra=self._queue.stats())
+
+    def set_filters(self, cameras: Optional[Iterable[str]], labels: Optional[Iterable[str]]) -> None:
+        """Replace the camera and label allowlists; safe to call while messages are flowing."""
+
+        self._cameras = frozenset(cameras) if cameras else None
+        self._labels = frozenset(label.lower() for label in labels) if labels else None
+
+    def reconfigure_mqtt(self, mqtt_config: MqttConfig) -> None:
+        """Close the current connection and reconnect with new broker settings."""
+
+        old_client = self._client
+        self._config = mqtt_config
+        client = self._new_client()
+        if self._stop_event is None:
+            # Not started yet; start() connects with the new settings.
+            self._client = client
+            return
+        old_client.disconnect()
+        old_client.loop_stop()
+        self._client = client
+        logger.info(
+            "Reconnecting to MQTT broker with new settings",
+            extra={"topic": mqtt_config.topic, "host": mqtt_config.host, "port": mqtt_config.port},
+        )
+        client.connect_async(mqtt_config.host, mqtt_config.port)
+        client.loop_start()
+
+    def _new_client(self) -> MqttTransport:
+        client = self._transport(self._config)
+        client.on_connect = self._on_connect
+        client.on_message = self._on_message
+        client.on_disconnect = self._on_disconnect
+        return client
+
+    def queue_stats(self) -> Optional[Dict[str, Any]]:
+        """Queue depth, drop and queued-time counters, or None when running inline."""
+
+        return self._queue.stats() if self._queue is not None else None
 
-    def _on_connect(self, client: mqtt.Client, userdata: Any, flags: Dict[str, Any], rc: int) -> None:
+    def _on_connect(self, client: MqttTransport, userdata: Any, flags: Dict[str, Any], rc: int) -> None:
         if rc == 0:
-            logger.info("Connected to MQTT broker", extra={"topic": self._config.topic})
+            self.connected = True
+            logger.info("Connected to MQTT broker", extra={"site": self._config.site, "topic": self._config.topic})
             client.subscribe(self._config.topic)
         else:
-            logger.error("MQTT connection failed", extra={"code": rc})
+            logger.error("MQTT connection failed", extra={"site": self._config.site, "code": rc})
 
-    def _on_disconnect(self, client: mqtt.Client, userdata: Any, rc: int) -> None:
-        logger.warning("Disconnected from MQTT broker", extra={"code": rc})
+    def _on_disconnect(self, client: MqttTransport, userdata: Any, rc: int) -> None:
+        self.connected = False
+        logger.warning("Disconnected from MQTT broker", extra={"site": self._config.site, "code": rc})
+
+    def _on_message(self, client: MqttTransport, userdata: Any, msg: mqtt.MQTTMessage) -> None:
+        self._handle_payload(msg.topic, msg.payload)
+
+    def _handle_payload(self, topic: str, raw: bytes) -> None:
+        metrics = self._metrics
+        site = self._config.site
+        if metrics is not None:
+            metrics.messages_received.labels(site).inc()
+        if not self._prefilter(raw):
+            self.rejected_messages += 1
+            if metrics is not None:
+                metrics.messages_rejected.labels(site).inc()
+            return
 
-    def _on_message(self, client: mqtt.Client, userdata: Any, msg: mqtt.MQTTMessage) -> None:
+        profiler = self._profiler
+        started = time.perf_counter() if profiler is not None else 0.0
         try:
-            payload_text = msg.payload.decode("utf-8")
+            payload_text = raw.decode("utf-8")
         except UnicodeDecodeError:
-            logger.warning("Ignoring message with undecodable payload", extra={"topic": msg.topic})
+            logger.warning("Ignoring message with undecodable payload", extra={"topic": topic})
+            if metrics is not None:
+                metrics.parse_failures.labels(site).inc()
             return
 
+        if profiler is not None:
+            decoded = time.perf_counter()
+            profiler.record("decode", decoded - started)
+            started = decoded
         try:
             payload = json.loads(payload_text)
         except json.JSONDecodeError:
             logger.warning("Ignoring non-JSON payload", extra={"payload": payload_text})
+            if metrics is not None:
+                metrics.parse_failures.labels(site).inc()
             return
 
+        if profiler is not None:
+            parsed = time.perf_counter()
+            profiler.record("json", parsed - started)
+            started = parsed
         event = self._normalize_event(payload)
+        if profiler is not None:
+            profiler.record("normalize", time.perf_counter() - started)
         if event is None:
             logger.debug("Ignoring unrecognized Frigate event", extra={"payload": payload})
+            if metrics is not None:
+                metrics.events_unrecognized.labels(site).inc()
             return
+        if metrics is not None:
+            metrics.events_normalized.labels(event.camera_id).inc()
 
+        if self._queue is not None:
+            self._queue.put(event)
+        else:
+            self._handle_event(event)
+
+    def normalize_payload(self, payload: Dict[str, Any]) -> Optional[AnyEvent]:
+        """Normalize an already parsed ``frigate/events`` message without dispatching it."""
+
+        return self._normalize_event(payload)
+
+    def _handle_event(self, event: AnyEvent) -> None:
         if self._on_event:
             try:
                 self._on_event(event)
             except Exception:  # noqa: BLE001
                 logger.exception("Failed to handle Frigate event")
 
-    def _normalize_event(self, payload: Dict[str, Any]) -> Optional[Event]:
+    def _normalize_event(self, payload: Dict[str, Any]) -> Optional[AnyEvent]:
         record = self._extract_event_record(payload)
         if record is None:
             return None
@@ -110,8 +261,14 @@ class FrigateMqttAdapter:
         if not camera_id or not label:
             return None
 
+        if self._cameras is not None and str(camera_id) not in self._cameras:
+            return None
+        if self._labels is not None and str(label).lower() not in self._labels:
+            return None
+
+        camera_id = self._config.camera_prefix + str(camera_id)
         event_type, meta_label = self._map_event_type(label)
-        timestamp = self._coerce_ts(
+        raw_ts = (
             record.get("frame_time")
             or record.get("start_time")
             or record.get("end_time")
@@ -123,24 +280,101 @@ class FrigateMqttAdapter:
         )
         snapshot_url = record.get("snapshot") or record.get("thumbnail")
 
-        meta: Dict[str, Any] = {}
+        # Allocated on the first field present, so payloads without metadata build no dict.
+        meta: Optional[Dict[str, Any]] = None
         if meta_label:
-            meta["label"] = meta_label
+            meta = {"label": meta_label}
         if "id" in record:
+            meta = meta or {}
             meta["event_id"] = record.get("id")
         if "sub_label" in record and record.get("sub_label"):
+            meta = meta or {}
             meta["sub_label"] = record.get("sub_label")
+        if isinstance(payload, dict) and payload.get("type"):
+            meta = meta or {}
+            meta["frigate_type"] = payload.get("type")
+        if record.get("entered_zones"):
+            meta = meta or {}
+            meta["entered_zones"] = list(record.get("entered_zones"))
+        if record.get("current_zones"):
+            meta = meta or {}
+            meta["current_zones"] = list(record.get("current_zones"))
+        if record.get("stationary"):
+            meta = meta or {}
+            meta["stationary"] = True
+        if record.get("position_changes") is not None:
+            meta = meta or {}
+            meta["position_changes"] = record.get("position_changes")
+
+        if self._compact_events:
+            return CompactEvent(
+                source="frigate",
+                camera_id=camera_id,
+                event_type=event_type,
+                ts=self._coerce_epoch(raw_ts),
+                confidence=confidence,
+                snapshot_url=snapshot_url,
+                meta=meta,
+            )
 
         return Event(
             source="frigate",
-            camera_id=str(camera_id),
+            camera_id=camera_id,
             event_type=event_type,
-            ts=timestamp,
+            ts=self._coerce_ts(raw_ts),
             confidence=confidence,
             snapshot_url=snapshot_url,
-            meta=meta,
+            meta=meta or {},
         )
 
+    def _prefilter(self, raw: bytes) -> bool:
+        """Reject payloads for cameras or labels outside the allowlists without a json.loads.
+
+        Only a definite miss rejects; payloads whose fields cannot be peeked are
+        parsed and checked again in ``_normalize_event``.
+        """
+
+        if self._cameras is not None:
+            camera = self._peek_camera(raw)
+            if camera is not None and camera not in self._cameras:
+                return False
+        if self._labels is not None:
+            label = self._peek_field(raw, b'"label"')
+            if label is not None and label.lower() not in self._labels:
+                return False
+        return True
+
+    @staticmethod
+    def _peek_camera(raw: bytes) -> Optional[str]:
+        """Pull the first ``"camera": "<name>"`` value out of a raw payload without parsing it.
+
+        Frigate puts the same camera in ``before`` and ``after``, so the first hit
+        is authoritative. Returns None when the field is missing or not a plain string.
+        """
+
+        return FrigateMqttAdapter._peek_field(raw, b'"camera"')
+
+    @staticmethod
+    def _peek_field(raw: bytes, quoted_key: bytes) -> Optional[str]:
+        idx = raw.find(quoted_key)
+        if idx < 0:
+            return None
+        key_end = idx + len(quoted_key)
+        colon = raw.find(b":", key_end)
+        # The key must be followed by only whitespace, ':' and an opening quote.
+        if colon < 0 or raw[key_end:colon].strip():
+            return None
+        start = raw.find(b'"', colon + 1)
+        if start < 0 or raw[colon + 1 : start].strip():
+            return None
+        end = raw.find(b'"', start + 1)
+        if end < 0 or raw.find(b"\\", start, end) >= 0:
+            return None
+        try:
+            return raw[start + 1 : end].decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+
     @staticmethod
     def _extract_event_record(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if isinstance(payload, dict):
@@ -173,6 +407,18 @@ class FrigateMqttAdapter:
                 pass
         return datetime.now(timezone.utc)
 
+    @staticmethod
+    def _coerce_epoch(raw: Any) -> float:
+        if isinstance(raw, (int, float)):
+            return float(raw)
+        if isinstance(raw, str):
+            try:
+                sanitized = raw.rstrip("Z")
+                return datetime.fromisoformat(sanitized).replace(tzinfo=timezone.utc).timestamp()
+            except ValueError:
+                pass
+        return time.time()
+
     @staticmethod
     def _coerce_confidence(raw: Any) -> Optional[float]:
         try:
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, Optional
+
+import paho.mqtt.client as mqtt
+
+from scc_core.adapters.frigate_mqtt import FrigateMqttAdapter, MqttConfig
+from scc_core.adapters.transport import MqttTransport, TransportFactory
+from scc_core.events import AnyEvent
+from scc_core.metrics import SccMetrics
+from scc_core.profiling import StageProfiler
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncFrigateMqttAdapter(FrigateMqttAdapter):
+    """Asyncio-native Frigate adapter driven by paho's socket callbacks.
+
+    The paho client's socket is registered with the running event loop
+    (``add_reader``/``add_writer``), so reads, writes and keepalives happen on
+    the loop without a network thread or polling. Normalized events are
+    buffered (oldest dropped past ``max_buffer``) and consumed with::
+
+        await adapter.start()
+        async for event in adapter.events():
+            ...
+
+    ``await adapter.stop()`` disconnects at once; ``events()`` then yields what
+    is still buffered and finishes.
+    """
+
+    def __init__(
+        self,
+        mqtt_config: MqttConfig,
+        compact_events: bool = False,
+        cameras: Optional[Iterable[str]] = None,
+        labels: Optional[Iterable[str]] = None,
+        max_buffer: int = 10_000,
+        metrics: Optional[SccMetrics] = None,
+        profiler: Optional[StageProfiler] = None,
+        transport: Optional[TransportFactory] = None,
+    ):
+        super().__init__(
+            mqtt_config=mqtt_config,
+            compact_events=compact_events,
+            cameras=cameras,
+            labels=labels,
+            metrics=metrics,
+            profiler=profiler,
+            transport=transport,
+        )
+        self._buffer: Deque[AnyEvent] = deque()
+        self._max_buffer = max_buffer
+        self.dropped_events = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._available: Optional[asyncio.Event] = None
+        self._misc_task: Optional["asyncio.Task[None]"] = None
+        self._closed = False
+        self._on_event = self._enqueue
+
+    def _new_client(self) -> MqttTransport:
+        client = super()._new_client()
+        client.on_socket_open = self._on_socket_open
+        client.on_socket_close = self._on_socket_close
+        client.on_socket_register_write = self._on_socket_register_write
+        client.on_socket_unregister_write = self._on_socket_unregister_write
+        return client
+
+    async def start(self) -> None:  # type: ignore[override]
+        """Connect and register the client socket with the running loop."""
+
+        self._loop = asyncio.get_running_loop()
+        self._available = asyncio.Event()
+        logger.info(
+            "Starting async Frigate MQTT adapter",
+            extra={
+                "site": self._config.site,
+                "topic": self._config.topic,
+                "host": self._config.host,
+                "port": self._config.port,
+            },
+        )
+        try:
+            self._connect()
+        except OSError:
+            # _misc_loop keeps retrying, so one unreachable broker does not stop the others.
+            logger.warning("MQTT broker unreachable; retrying", extra={"site": self._config.site})
+        except Exception:  # noqa: BLE001
+            logger.exception("Failed to connect to MQTT broker")
+            raise
+        self._misc_task = self._loop.create_task(self._misc_loop())
+
+    def reconfigure_mqtt(self, mqtt_config: MqttConfig) -> None:
+        """Thread-safe; the old client is closed and the new one connected on the adapter's loop."""
+
+        if self._loop is None:
+            # Not started yet; start() connects with the new settings.
+            self._config = mqtt_config
+            self._client = self._new_client()
+            return
+        self._loop.call_soon_threadsafe(self._swap_client, mqtt_config)
+
+    def _swap_client(self, mqtt_config: MqttConfig) -> None:
+        if self._closed:
+            return
+        self._client.disconnect()
+        self._config = mqtt_config
+        self._client = self._new_client()
+        logger.info(
+            "Reconnecting to MQTT broker with new settings",
+            extra={"topic": mqtt_config.topic, "host": mqtt_config.host, "port": mqtt_config.port},
+        )
+        try:
+            self._connect()
+        except OSError:
+            # _misc_loop keeps retrying against the new settings.
+            logger.warning("MQTT connect failed; retrying", extra={"host": mqtt_config.host})
+
+    def _connect(self) -> None:
+        self._client.connect(self._config.host, self._config.port)
+
+    async def stop(self) -> None:
+        """Disconnect promptly; buffered events are still delivered by ``events()``."""
+
+        if self._closed:
+            return
+        logger.info("Stopping async Frigate MQTT adapter")
+        self._closed = True
+        self._client.disconnect()
+        if self._misc_task is not None:
+            self._misc_task.cancel()
+            try:
+                await self._misc_task
+            except asyncio.CancelledError:
+                pass
+        if self._available is not None:
+            self._available.set()
+
+    async def events(self) -> AsyncIterator[AnyEvent]:
+        """Yield normalized events until ``stop()`` is called and the buffer is drained."""
+
+        assert self._available is not None, "start() must be awaited first"
+        while True:
+            while self._buffer:
+                yield self._buffer.popleft()
+            if self._closed:
+                return
+            self._available.clear()
+            await self._available.wait()
+
+    def _enqueue(self, event: AnyEvent) -> None:
+        if len(self._buffer) >= self._max_buffer:
+            self._buffer.popleft()
+            self.dropped_events += 1
+        self._buffer.append(event)
+        if self._available is not None:
+            self._available.set()
+
+    async def _misc_loop(self) -> None:
+        """Drive keepalives and reconnect with backoff, as ``loop_start`` would."""
+
+        delay = 1.0
+        while not self._closed:
+            rc = self._client.loop_misc()
+            if rc == mqtt.MQTT_ERR_NO_CONN and not self._closed:
+                await asyncio.sleep(delay)
+                try:
+                    self._client.reconnect()
+                    delay = 1.0
+                except OSError:
+                    logger.warning("MQTT reconnect failed; retrying", extra={"delay": delay})
+                    delay = min(delay * 2, 30.0)
+                continue
+            await asyncio.sleep(1)
+
+    def _on_socket_open(self, client: mqtt.Client, userdata: Any, sock: Any) -> None:
+        assert self._loop is not None
+        self._loop.add_reader(sock, client.loop_read)
+
+    def _on_socket_close(self, client: mqtt.Client, userdata: Any, sock: Any) -> None:
+        assert self._loop is not None
+        self._loop.remove_reader(sock)
+
+    def _on_socket_register_write(self, client: mqtt.Client, userdata: Any, sock: Any) -> None:
+        assert self._loop is not None
+        self._loop.add_writer(sock, client.loop_write)
+
+    def _on_socket_unregister_write(self, client: mqtt.Client, userdata: Any, sock: Any) -> None:
+        assert self._loop is not None
+        self._loop.remove_writer(sock)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self._buffer),
+            "dropped": self.dropped_events,
+            "rejected": self.rejected_messages,
+        }
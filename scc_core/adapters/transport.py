@@ -0,0 +1,177 @@
+"""MQTT transports for the Frigate adapters.
+
+The adapters only use a small part of paho's client API, described by
+:class:`MqttTransport`. ``paho_transport`` builds the production client; an
+:class:`InMemoryBroker` hands out :class:`InMemoryTransport` clients that
+deliver messages without a network::
+
+    broker = InMemoryBroker()
+    adapter = FrigateMqttAdapter(MqttConfig(host="memory", topic="frigate/#"), transport=broker.transport)
+    ...
+    broker.publish("frigate/events", payload)
+
+In-memory delivery is synchronous: ``publish`` calls every matching
+subscriber's ``on_message`` on the publishing thread before it returns, so
+runs are deterministic and benchmarks time SCC code rather than broker
+round-trips. Topic filters support the MQTT ``+`` and ``#`` wildcards. There
+is no QoS, retained message or session state. With the asyncio adapter,
+publish from the adapter's event loop.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Protocol, Tuple
+
+import paho.mqtt.client as mqtt
+
+if TYPE_CHECKING:
+    from .frigate_mqtt import MqttConfig
+
+
+class MqttTransport(Protocol):
+    """The part of paho's ``mqtt.Client`` the adapters rely on."""
+
+    on_connect: Optional[Callable[..., None]]
+    on_disconnect: Optional[Callable[..., None]]
+    on_message: Optional[Callable[..., None]]
+
+    def connect(self, host: str, port: int = 1883) -> Any: ...
+
+    def connect_async(self, host: str, port: int = 1883) -> Any: ...
+
+    def subscribe(self, topic: str) -> Any: ...
+
+    def publish(self, topic: str, payload: bytes) -> Any: ...
+
+    def loop_start(self) -> Any: ...
+
+    def loop_stop(self) -> Any: ...
+
+    def disconnect(self) -> Any: ...
+
+
+TransportFactory = Callable[["MqttConfig"], MqttTransport]
+
+
+def paho_transport(config: MqttConfig) -> mqtt.Client:
+    """Production transport: a paho client with the configured credentials and reconnect backoff."""
+
+    client = mqtt.Client(client_id=config.client_id)
+    if config.username:
+        client.username_pw_set(config.username, config.password)
+    client.reconnect_delay_set(min_delay=1, max_delay=30)
+    return client
+
+
+class InMemoryMessage:
+    """Stand-in for ``mqtt.MQTTMessage`` with the fields the adapters read."""
+
+    __slots__ = ("topic", "payload")
+
+    def __init__(self, topic: str, payload: bytes):
+        self.topic = topic
+        self.payload = payload
+
+
+class InMemoryBroker:
+    """Route published messages to in-memory subscribers; thread-safe."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscriptions: List[Tuple[str, "InMemoryTransport"]] = []
+        # topic -> subscribers, rebuilt lazily after every (un)subscribe.
+        self._routes: Dict[str, Tuple["InMemoryTransport", ...]] = {}
+
+    def transport(self, config: Optional[MqttConfig] = None) -> InMemoryTransport:
+        """Transport factory for the adapters' ``transport=`` argument."""
+
+        return InMemoryTransport(self, client_id=config.client_id if config is not None else None)
+
+    def publish(self, topic: str, payload: bytes) -> int:
+        """Deliver ``payload`` to every matching subscriber; returns the number of deliveries."""
+
+        subscribers = self._routes.get(topic)
+        if subscribers is None:
+            subscribers = self._route(topic)
+        for transport in subscribers:
+            transport._deliver(topic, payload)
+        return len(subscribers)
+
+    def _route(self, topic: str) -> Tuple["InMemoryTransport", ...]:
+        with self._lock:
+            seen: List[InMemoryTransport] = []
+            for topic_filter, transport in self._subscriptions:
+                if transport not in seen and mqtt.topic_matches_sub(topic_filter, topic):
+                    seen.append(transport)
+            subscribers = tuple(seen)
+            self._routes[topic] = subscribers
+        return subscribers
+
+    def _subscribe(self, transport: "InMemoryTransport", topic_filter: str) -> None:
+        with self._lock:
+            if (topic_filter, transport) not in self._subscriptions:
+                self._subscriptions.append((topic_filter, transport))
+            self._routes = {}
+
+    def _unsubscribe_all(self, transport: "InMemoryTransport") -> None:
+        with self._lock:
+            self._subscriptions = [entry for entry in self._subscriptions if entry[1] is not transport]
+            self._routes = {}
+
+
+class InMemoryTransport:
+    """Client side of :class:`InMemoryBroker`, with paho's callback signatures."""
+
+    def __init__(self, broker: InMemoryBroker, client_id: Optional[str] = None):
+        self.broker = broker
+        self.client_id = client_id
+        self.connected = False
+        self.on_connect: Optional[Callable[..., None]] = None
+        self.on_disconnect: Optional[Callable[..., None]] = None
+        self.on_message: Optional[Callable[..., None]] = None
+
+    def connect(self, host: str = "memory", port: int = 0) -> int:
+        if not self.connected:
+            self.connected = True
+            if self.on_connect is not None:
+                self.on_connect(self, None, {}, 0)
+        return mqtt.MQTT_ERR_SUCCESS
+
+    connect_async = connect
+
+    def subscribe(self, topic: str) -> Tuple[int, None]:
+        self.broker._subscribe(self, topic)
+        return mqtt.MQTT_ERR_SUCCESS, None
+
+    def publish(self, topic: str, payload: bytes) -> int:
+        self.broker.publish(topic, payload)
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def disconnect(self) -> int:
+        self.broker._unsubscribe_all(self)
+        if self.connected:
+            self.connected = False
+            if self.on_disconnect is not None:
+                self.on_disconnect(self, None, 0)
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def loop_start(self) -> int:
+        # Delivery happens on the publishing thread; there is no network loop to run.
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def loop_stop(self) -> int:
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def loop_misc(self) -> int:
+        return mqtt.MQTT_ERR_SUCCESS if self.connected else mqtt.MQTT_ERR_NO_CONN
+
+    def reconnect(self) -> int:
+        return self.connect()
+
+    def socket(self) -> None:
+        return None
+
+    def _deliver(self, topic: str, payload: bytes) -> None:
+        if self.on_message is not None:
+            self.on_message(self, None, InMemoryMessage(topic, payload))
@@ -0,0 +1,254 @@
+"""Startup catch-up from Frigate's event history API.
+
+On start SCC knows nothing about objects already in view, so the first live
+update for each of them would be announced as new. ``run_backfill`` pages
+``/api/events`` for the last ``lookback_seconds`` (plus everything still in
+progress) and feeds the records to a seed callback that updates lifecycle and
+dedupe state without emitting anything.
+
+Paging is concurrent and bounded: the lookback is cut into ``concurrency``
+time slices fetched in parallel, each slice paging backwards with ``before=``
+until a short page, with one keep-alive connection per worker thread.
+
+Live MQTT is subscribed before the backfill starts and its events wait in a
+:class:`LiveGate`; once the history is seeded the gate replays them in
+arrival order and then passes events straight through. Anything that happened
+after the history was read therefore still arrives live (no gap), and events
+already seeded are recognized by the lifecycle tracker and dedupe windows (no
+duplicates). Objects that started after the gate began collecting, or whose
+live ``new`` is already held, are left out of the seed: their live events are
+their first sighting and get announced normally.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from .events import AnyEvent
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BackfillConfig:
+    # Frigate base URL per MQTT connection (site name; "default" without sites).
+    sources: Dict[str, str] = field(default_factory=dict)
+    lookback_seconds: float = 600.0
+    page_size: int = 100
+    concurrency: int = 4
+    timeout: float = 5.0
+
+
+class LiveGate:
+    """Hold live events until :meth:`open`, then replay them in order and pass the rest through."""
+
+    def __init__(self, on_event: Callable[[AnyEvent], None]):
+        self._on_event = on_event
+        self._buffer: Deque[AnyEvent] = deque()
+        # (camera_id, Frigate event id) of held ``new`` events: objects that appeared during catch-up.
+        self._held_new: Set[Tuple[str, Any]] = set()
+        self._lock = threading.Lock()
+        self._open = False
+        # Wall time from which live events are collected; anything newer is live, not history.
+        self.since = time.time()
+
+    def __call__(self, event: AnyEvent) -> None:
+        if self._open:
+            self._on_event(event)
+            return
+        with self._lock:
+            if not self._open:
+                self._buffer.append(event)
+                event_id = event.meta.get("event_id")
+                if event_id is not None and event.meta.get("frigate_type") == "new":
+                    self._held_new.add((event.camera_id, event_id))
+                return
+        self._on_event(event)
+
+    def holds_new(self, event: AnyEvent) -> bool:
+        """Whether the live ``new`` of the same Frigate object is waiting in the gate."""
+
+        event_id = event.meta.get("event_id")
+        if event_id is None:
+            return False
+        with self._lock:
+            return (event.camera_id, event_id) in self._held_new
+
+    def open(self) -> int:
+        """Deliver the held events and stop holding; returns how many were held."""
+
+        with self._lock:
+            held = len(self._buffer)
+            while self._buffer:
+                try:
+                    self._on_event(self._buffer.popleft())
+                except Exception:  # noqa: BLE001
+                    logger.exception("Failed to handle Frigate event")
+            self._open = True
+            self._held_new.clear()
+        return held
+
+
+class FrigateHistoryClient:
+    """Page ``/api/events`` from one Frigate instance with bounded concurrency."""
+
+    def __init__(self, base_url: str, page_size: int = 100, concurrency: int = 4, timeout: float = 5.0):
+        parts = urlsplit(base_url)
+        if parts.scheme not in {"http", "https"}:
+            raise ValueError(f"Unsupported Frigate URL {base_url!r}")
+        self._scheme = parts.scheme
+        self._netloc = parts.netloc
+        self._prefix = parts.path.rstrip("/")
+        self.page_size = max(1, page_size)
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections: List[http.client.HTTPConnection] = []
+        self._connections_lock = threading.Lock()
+        self.requests = 0
+
+    def events(self, after: float, before: float) -> List[Dict[str, Any]]:
+        """Return every event that started in ``(after, before)`` or is still in progress, oldest first."""
+
+        step = (before - after) / self.concurrency
+        slices = [(after + index * step, after + (index + 1) * step) for index in range(self.concurrency)]
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="scc-backfill") as pool:
+                # Objects still in view may have started long before the lookback.
+                in_progress = pool.submit(self._slice, 0.0, before, in_progress=1)
+                pages = list(pool.map(lambda window: self._slice(*window), slices))
+                pages.append(in_progress.result())
+        finally:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+
+        by_id: Dict[Any, Dict[str, Any]] = {}
+        for page in pages:
+            for record in page:
+                if isinstance(record, dict) and record.get("id") is not None:
+                    by_id[record["id"]] = record
+        return sorted(by_id.values(), key=lambda record: float(record.get("start_time") or 0.0))
+
+    def _slice(self, after: float, before: float, **filters: Any) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = []
+        seen = set()
+        while True:
+            page = self._get({**filters, "after": after, "before": before, "limit": self.page_size})
+            fresh = [record for record in page if record.get("id") not in seen]
+            records.extend(fresh)
+            seen.update(record.get("id") for record in fresh)
+            # Newest first: continue below the oldest start time until a short page.
+            if len(page) < self.page_size or not fresh:
+                return records
+            before = min(float(record.get("start_time") or after) for record in page)
+            if before <= after:
+                return records
+
+    def _get(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        path = f"{self._prefix}/api/events?{urlencode(params)}"
+        conn = self._connection()
+        try:
+            conn.request("GET", path, headers={"Accept": "application/json"})
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            # Drop the (possibly half-used) keep-alive connection; the next request reconnects.
+            conn.close()
+            raise
+        self.requests += 1
+        if response.status != 200:
+            raise RuntimeError(f"Frigate returned HTTP {response.status} for {path}")
+        data = json.loads(body)
+        return data if isinstance(data, list) else []
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            factory = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            conn = self._local.conn = factory(self._netloc, timeout=self.timeout)
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+
+def history_payloads(records: Iterable[Dict[str, Any]], now: float) -> Iterable[Dict[str, Any]]:
+    """Turn ``/api/events`` records into Frigate MQTT-style ``frigate/events`` messages."""
+
+    for record in records:
+        if record.get("false_positive"):
+            continue
+        data = record.get("data") if isinstance(record.get("data"), dict) else {}
+        end_time = record.get("end_time")
+        after = {
+            "id": record.get("id"),
+            "camera": record.get("camera"),
+            "label": record.get("label"),
+            "sub_label": record.get("sub_label"),
+            "top_score": record.get("top_score") or data.get("top_score") or data.get("score"),
+            "start_time": record.get("start_time"),
+            "end_time": end_time,
+            "entered_zones": record.get("zones") or [],
+            # In-progress objects are still in view, so their incidents are current.
+            "frame_time": end_time or now,
+        }
+        yield {"type": "end" if end_time else "new", "after": after}
+
+
+def run_backfill(
+    config: BackfillConfig,
+    normalizers: Dict[str, Callable[[Dict[str, Any]], Optional[AnyEvent]]],
+    seed: Callable[[AnyEvent], None],
+    now: Optional[float] = None,
+    gate: Optional[LiveGate] = None,
+) -> Tuple[int, int]:
+    """Seed state from each source's history; returns ``(records fetched, events seeded)``.
+
+    With ``gate``, objects that started after it began collecting or whose live
+    ``new`` it holds are not seeded, so that ``new`` stays their first sighting.
+    """
+
+    now = time.time() if now is None else now
+    fetched = seeded = 0
+    for site, url in config.sources.items():
+        normalize = normalizers.get(site)
+        if normalize is None:
+            logger.warning("Backfill source has no matching MQTT connection", extra={"site": site})
+            continue
+        client = FrigateHistoryClient(url, config.page_size, config.concurrency, config.timeout)
+        started = time.monotonic()
+        try:
+            records = client.events(now - config.lookback_seconds, now)
+        except (OSError, http.client.HTTPException, RuntimeError, ValueError):
+            logger.exception("Backfill failed; starting live only", extra={"site": site, "url": url})
+            continue
+        fetched += len(records)
+        # Seed in activity order so dedupe sees timestamps the way it would have live.
+        if gate is not None:
+            records = [record for record in records if float(record.get("start_time") or 0.0) < gate.since]
+        payloads = sorted(history_payloads(records, now), key=lambda payload: float(payload["after"]["frame_time"]))
+        for payload in payloads:
+            event = normalize(payload)
+            if event is None or (gate is not None and gate.holds_new(event)):
+                continue
+            seed(event)
+            seeded += 1
+        logger.info(
+            "Backfilled Frigate history",
+            extra={
+                "site": site,
+                "records": len(records),
+                "requests": client.requests,
+                "seconds": round(time.monotonic() - started, 3),
+            },
+        )
+    return fetched, seeded
@@ -2,11 +2,20 @@ from __future__ import annotations
 
 import importlib.util
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, FrozenSet, List, Optional
 
 from scc_core.adapters.frigate_mqtt import MqttConfig
+from scc_core.backfill import BackfillConfig
+from scc_core.correlation import CorrelationConfig
+from scc_core.dedupe import AdaptiveWindow
+from scc_core.journal import JournalConfig
+from scc_core.ratelimit import RateLimitConfig
+from scc_core.rules import RulesConfig
+from scc_core.sinks import SinkConfig
+from scc_core.snapshots import SnapshotConfig
+from scc_core.workqueue import QueueConfig
 
 logger = logging.getLogger(__name__)
 
@@ -69,10 +78,193 @@ def _coerce_value(raw: str) -> Any:
         return raw.strip('"')
 
 
+def _name_set(raw: Any) -> Optional[FrozenSet[str]]:
+    """Parse an allowlist given as a YAML list or a comma-separated string; empty means no filter."""
+
+    if raw is None:
+        return None
+    items = raw.split(",") if isinstance(raw, str) else raw
+    names = frozenset(str(item).strip() for item in items if str(item).strip())
+    return names or None
+
+
+_SINK_COMMON_KEYS = {"enabled", "batch_size", "flush_ms", "max_backlog"}
+
+
+def _sink_configs(section: Any) -> List[SinkConfig]:
+    """Parse ``sinks: {<kind>: {...}}``; no section keeps the original stdout-only behaviour."""
+
+    if not isinstance(section, dict):
+        return [SinkConfig(kind="stdout")]
+
+    configs = []
+    for kind, options in section.items():
+        options = options if isinstance(options, dict) else {}
+        if not options.get("enabled", True):
+            continue
+        configs.append(
+            SinkConfig(
+                kind=str(kind),
+                batch_size=int(options.get("batch_size", 100)),
+                flush_interval=float(options.get("flush_ms", 100)) / 1000.0,
+                max_backlog=int(options.get("max_backlog", 10_000)),
+                options={key: value for key, value in options.items() if key not in _SINK_COMMON_KEYS},
+            )
+        )
+    return configs
+
+
+def _journal_config(section: Any) -> Optional[JournalConfig]:
+    if not isinstance(section, dict) or not section.get("path"):
+        return None
+    return JournalConfig(
+        path=Path(section["path"]).expanduser(),
+        segment_bytes=int(float(section.get("segment_mb", 16)) * 1024 * 1024),
+        segment_seconds=float(section.get("segment_minutes", 60)) * 60.0,
+        retention_seconds=float(section.get("retention_hours", 168)) * 3600.0,
+        max_total_bytes=int(float(section.get("max_total_mb", 1024)) * 1024 * 1024),
+    )
+
+
+def _mqtt_config(section: Any, site: Optional[str] = None) -> MqttConfig:
+    section = section if isinstance(section, dict) else {}
+    config = MqttConfig(
+        host=str(section.get("host", "localhost")),
+        port=int(section.get("port", 1883)),
+        username=section.get("username"),
+        password=section.get("password"),
+        topic=str(section.get("topic", "frigate/events")),
+        client_id=section.get("client_id", "scc-frigate" if site is None else f"scc-frigate-{site}"),
+    )
+    if site is not None:
+        config.site = site
+        config.camera_prefix = str(section.get("camera_prefix", f"{site}:"))
+    return config
+
+
+def _site_configs(section: Any) -> Dict[str, MqttConfig]:
+    """Parse ``sites: {<name>: {host, port, ..., camera_prefix}}`` into one MqttConfig per site."""
+
+    if not isinstance(section, dict):
+        return {}
+    return {str(name): _mqtt_config(options, site=str(name)) for name, options in section.items()}
+
+
+def _adaptive_window(section: Any) -> Optional[AdaptiveWindow]:
+    if not isinstance(section, dict) or not section.get("enabled", False):
+        return None
+    return AdaptiveWindow(
+        threshold_per_minute=float(section.get("threshold_per_minute", 30)),
+        max_factor=float(section.get("max_factor", 4)),
+    )
+
+
+def _rate_limit_config(section: Any) -> Optional[RateLimitConfig]:
+    if not isinstance(section, dict) or not section:
+        return None
+    cameras = section.get("cameras") or {}
+    return RateLimitConfig(
+        rate_per_minute=float(section.get("rate_per_minute", 0)),
+        burst=float(section.get("burst", 3)),
+        cameras={str(name): float(rate) for name, rate in cameras.items()} if isinstance(cameras, dict) else {},
+        global_rate_per_minute=float(section.get("global_rate_per_minute", 0)),
+        global_burst=float(section.get("global_burst", 10)),
+    )
+
+
+def _correlation_config(section: Any) -> Optional[CorrelationConfig]:
+    if not isinstance(section, dict) or not section.get("links"):
+        return None
+    return CorrelationConfig(
+        links=[link for link in section["links"] if isinstance(link, dict)],
+        slack_seconds=float(section.get("slack_seconds", 5)),
+        retain_seconds=float(section.get("retain_seconds", 600)),
+    )
+
+
+def _snapshot_config(section: Any) -> Optional[SnapshotConfig]:
+    if not isinstance(section, dict) or not section.get("enabled", False):
+        return None
+    return SnapshotConfig(
+        base_url=str(section.get("frigate_url", "http://127.0.0.1:5000")),
+        kind=str(section.get("kind", "snapshot")),
+        cache_dir=Path(str(section.get("cache_dir", "~/.cache/scc/snapshots"))).expanduser(),
+        max_bytes=int(section.get("max_mb", 256)) * 1024 * 1024,
+        timeout=float(section.get("timeout", 5)),
+        workers=int(section.get("workers", 2)),
+        max_pending=int(section.get("max_pending", 100)),
+        cameras=_name_set(section.get("cameras")),
+    )
+
+
+def _backfill_config(section: Any) -> Optional[BackfillConfig]:
+    if not isinstance(section, dict) or not section.get("enabled", False):
+        return None
+    urls = section.get("frigate_url", "http://127.0.0.1:5000")
+    # One URL for the single broker, or {site: url} when ingesting from several sites.
+    sources = {str(site): str(url) for site, url in urls.items()} if isinstance(urls, dict) else {"default": str(urls)}
+    return BackfillConfig(
+        sources=sources,
+        lookback_seconds=float(section.get("lookback_seconds", 600)),
+        page_size=int(section.get("page_size", 100)),
+        concurrency=int(section.get("concurrency", 4)),
+        timeout=float(section.get("timeout", 5)),
+    )
+
+
+def _rules_config(section: Any) -> RulesConfig:
+    if not isinstance(section, dict):
+        return RulesConfig()
+    default = section.get("default", ["notify"])
+    return RulesConfig(
+        rules=[rule for rule in section.get("rules") or [] if isinstance(rule, dict)],
+        schedules=dict(section.get("schedules") or {}),
+        default=tuple([default] if isinstance(default, str) else default),
+        manual_announce=bool(section.get("manual_announce", False)),
+        timezone=section.get("timezone"),
+    )
+
+
 @dataclass
 class AppConfig:
     mqtt: MqttConfig
     dedupe_window_seconds: int = 15
+    dedupe_windows: Dict[str, float] = field(default_factory=dict)
+    dedupe_adaptive: Optional[AdaptiveWindow] = None
+    rate_limit: Optional[RateLimitConfig] = None
+    correlation: Optional[CorrelationConfig] = None
+    sites: Dict[str, MqttConfig] = field(default_factory=dict)
+    snapshots: Optional[SnapshotConfig] = None
+    backfill: Optional[BackfillConfig] = None
+    lifecycle_tracking: bool = True
+    suppress_stationary: bool = True
+    min_score_gain: float = 0.05
+    dedupe_zone_keys: bool = False
+    queue: Optional[QueueConfig] = None
+    compact_events: bool = False
+    state_path: Optional[Path] = None
+    state_snapshot_seconds: int = 30
+    shard_workers: int = 1
+    shard_reorder_seconds: float = 0.25
+    cameras: Optional[FrozenSet[str]] = None
+    labels: Optional[FrozenSet[str]] = None
+    runtime: str = "threads"
+    sinks: List[SinkConfig] = field(default_factory=lambda: [SinkConfig(kind="stdout")])
+    journal: Optional[JournalConfig] = None
+    api_socket: Optional[Path] = None
+    api_ring_size: int = 10_000
+    metrics_port: Optional[int] = None
+    metrics_host: str = "127.0.0.1"
+    profiling: bool = False
+    profiling_samples: int = 65_536
+    profiling_dump_dir: Path = Path("/tmp")
+    reload_poll_seconds: float = 2.0
+    rules: RulesConfig = field(default_factory=RulesConfig)
+
+    def connections(self) -> List[MqttConfig]:
+        """MQTT connections to ingest from: one per site, or the ``mqtt`` broker when no sites are set."""
+
+        return list(self.sites.values()) if self.sites else [self.mqtt]
 
 
 def load_app_config(path: Path) -> AppConfig:
@@ -80,15 +272,67 @@ def load_app_config(path: Path) -> AppConfig:
 
     mqtt_section = data.get("mqtt", {}) if isinstance(data, dict) else {}
     dedupe_section = data.get("dedupe", {}) if isinstance(data, dict) else {}
+    queue_section = data.get("queue", {}) if isinstance(data, dict) else {}
+    events_section = data.get("events", {}) if isinstance(data, dict) else {}
+    state_section = data.get("state", {}) if isinstance(data, dict) else {}
+    sharding_section = data.get("sharding", {}) if isinstance(data, dict) else {}
+    filters_section = data.get("filters", {}) if isinstance(data, dict) else {}
+    sinks_section = data.get("sinks") if isinstance(data, dict) else None
+    journal_section = data.get("journal", {}) if isinstance(data, dict) else {}
+    api_section = data.get("api", {}) if isinstance(data, dict) else {}
+    metrics_section = data.get("metrics", {}) if isinstance(data, dict) else {}
+    profiling_section = data.get("profiling", {}) if isinstance(data, dict) else {}
+    reload_section = data.get("reload", {}) if isinstance(data, dict) else {}
+    rules_section = data.get("rules", {}) if isinstance(data, dict) else {}
+    rate_limit_section = data.get("rate_limit", {}) if isinstance(data, dict) else {}
+    correlation_section = data.get("correlation", {}) if isinstance(data, dict) else {}
+    sites_section = data.get("sites", {}) if isinstance(data, dict) else {}
+    snapshots_section = data.get("snapshots", {}) if isinstance(data, dict) else {}
+    backfill_section = data.get("backfill", {}) if isinstance(data, dict) else {}
 
-    mqtt_config = MqttConfig(
-        host=str(mqtt_section.get("host", "localhost")),
-        port=int(mqtt_section.get("port", 1883)),
-        username=mqtt_section.get("username"),
-        password=mqtt_section.get("password"),
-        topic=str(mqtt_section.get("topic", "frigate/events")),
-        client_id=mqtt_section.get("client_id", "scc-frigate"),
-    )
+    mqtt_config = _mqtt_config(mqtt_section)
     window_seconds = int(dedupe_section.get("window_seconds", 15))
-    return AppConfig(mqtt=mqtt_config, dedupe_window_seconds=window_seconds)
+    lifecycle_tracking = bool(dedupe_section.get("lifecycle_tracking", True))
+    queue_config = None
+    if isinstance(queue_section, dict) and queue_section.get("enabled", False):
+        queue_config = QueueConfig(
+            max_size=int(queue_section.get("max_size", 1000)),
+            workers=int(queue_section.get("workers", 1)),
+            overflow=str(queue_section.get("overflow", "block")),
+        )
+    return AppConfig(
+        mqtt=mqtt_config,
+        dedupe_window_seconds=window_seconds,
+        dedupe_windows={str(key): float(value) for key, value in (dedupe_section.get("windows") or {}).items()},
+        dedupe_adaptive=_adaptive_window(dedupe_section.get("adaptive")),
+        rate_limit=_rate_limit_config(rate_limit_section),
+        correlation=_correlation_config(correlation_section),
+        sites=_site_configs(sites_section),
+        snapshots=_snapshot_config(snapshots_section),
+        backfill=_backfill_config(backfill_section),
+        lifecycle_tracking=lifecycle_tracking,
+        suppress_stationary=bool(dedupe_section.get("suppress_stationary", True)),
+        min_score_gain=float(dedupe_section.get("min_score_gain", 0.05)),
+        dedupe_zone_keys=bool(dedupe_section.get("zone_keys", False)),
+        queue=queue_config,
+        compact_events=bool(events_section.get("compact", False)),
+        state_path=Path(state_section["path"]).expanduser() if state_section.get("path") else None,
+        state_snapshot_seconds=int(state_section.get("snapshot_seconds", 30)),
+        shard_workers=int(sharding_section.get("workers", 1)),
+        shard_reorder_seconds=float(sharding_section.get("reorder_ms", 250)) / 1000.0,
+        cameras=_name_set(filters_section.get("cameras")),
+        labels=_name_set(filters_section.get("labels")),
+        runtime=str(data.get("runtime", "threads")) if isinstance(data, dict) else "threads",
+        sinks=_sink_configs(sinks_section),
+        journal=_journal_config(journal_section),
+        api_socket=Path(api_section["socket"]).expanduser() if api_section.get("socket") else None,
+        api_ring_size=int(api_section.get("ring_size", 10_000)),
+        metrics_port=int(metrics_section["port"]) if metrics_section.get("port") else None,
+        metrics_host=str(metrics_section.get("host", "127.0.0.1")),
+        profiling=bool(profiling_section.get("enabled", False)),
+        profiling_samples=int(profiling_section.get("samples", 65_536)),
+        profiling_dump_dir=Path(str(profiling_section.get("dump_dir", "/tmp"))).expanduser(),
+        reload_poll_seconds=float(reload_section.get("poll_seconds", 2.0)),
+        rules=_rules_config(rules_section),
+    )
 
@@ -0,0 +1,142 @@
+"""Cross-camera correlation over a camera adjacency graph.
+
+A vehicle that enters at ``front_gate`` and passes ``signpost`` is one arrival,
+but Frigate reports it as two events on two cameras. ``CameraCorrelator``
+takes links between neighboring cameras with an expected transit time and
+marks an event as a continuation when an event of the same type was last seen
+on a neighbor within that transit time (plus slack). Continuations inherit the
+track of the event they continue, so a chain gate -> signpost -> yard stays
+one incident. Each sighting can be continued once per neighbor, and never by
+the camera it came from, so an object lingering on one camera does not swallow
+every later arrival next door.
+
+Sightings are kept per ``(camera, event_type)`` in last-seen order, so a match
+walks only the neighbors' most recent sightings inside the transit window and
+never the full set of open incidents.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .events import AnyEvent, event_epoch
+
+
+@dataclass
+class CorrelationConfig:
+    """``links``: ``{"cameras": [a, b], "transit_seconds": 20}`` entries (both directions)."""
+
+    links: List[Dict[str, Any]] = field(default_factory=list)
+    slack_seconds: float = 5.0
+    retain_seconds: float = 600.0
+
+
+@dataclass
+class _Sighting:
+    last_seen: float
+    # Event id that started the track; equal to the sighting's own id for a fresh arrival.
+    track: Any
+    # Cameras that already continued this sighting; each neighbor may continue it once.
+    claimed: Tuple[str, ...] = ()
+
+
+def camera_groups(config: CorrelationConfig) -> Dict[str, str]:
+    """Map each linked camera to one representative of its connected component."""
+
+    parent: Dict[str, str] = {}
+
+    def find(camera: str) -> str:
+        parent.setdefault(camera, camera)
+        while parent[camera] != camera:
+            parent[camera] = parent[parent[camera]]
+            camera = parent[camera]
+        return camera
+
+    for link in config.links:
+        cameras = [str(camera) for camera in link.get("cameras") or ()]
+        for camera in cameras[1:]:
+            root_a, root_b = find(cameras[0]), find(camera)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+    return {camera: find(camera) for camera in parent}
+
+
+class CameraCorrelator:
+    """Flag events that continue a track from a neighboring camera; callers serialize access."""
+
+    def __init__(self, config: CorrelationConfig):
+        self._retain = config.retain_seconds
+        # camera -> [(neighbor, max transit seconds)]
+        self._neighbors: Dict[str, List[Tuple[str, float]]] = {}
+        for link in config.links:
+            cameras = [str(camera) for camera in link.get("cameras") or ()]
+            window = float(link.get("transit_seconds", 30)) + config.slack_seconds
+            for camera in cameras:
+                for other in cameras:
+                    if other != camera:
+                        self._neighbors.setdefault(camera, []).append((other, window))
+        self._sightings: Dict[Tuple[str, str], "OrderedDict[Any, _Sighting]"] = {}
+
+    def observe(self, event: AnyEvent) -> bool:
+        """Record the sighting; return True when it continues a track from a neighbor."""
+
+        neighbors = self._neighbors.get(event.camera_id)
+        event_id = event.meta.get("event_id")
+        if neighbors is None or event_id is None:
+            return False
+
+        ts = event_epoch(event)
+        key = (event.camera_id, event.event_type)
+        sightings = self._sightings.get(key)
+        if sightings is None:
+            sightings = self._sightings[key] = OrderedDict()
+        self._purge(sightings, ts)
+
+        sighting = sightings.get(event_id)
+        if sighting is None:
+            match = self._match(event.camera_id, neighbors, event.event_type, ts)
+            if match is None:
+                sighting = sightings[event_id] = _Sighting(ts, event_id)
+            else:
+                source, track = match
+                # The object came from ``source``; it cannot continue back there as a new arrival.
+                sighting = sightings[event_id] = _Sighting(ts, track, claimed=(source,))
+        else:
+            sighting.last_seen = max(sighting.last_seen, ts)
+            sightings.move_to_end(event_id)
+        return sighting.track != event_id
+
+    def _match(
+        self, camera_id: str, neighbors: List[Tuple[str, float]], event_type: str, ts: float
+    ) -> Optional[Tuple[str, Any]]:
+        """Return ``(neighbor camera, track)`` of the sighting this one continues, if any."""
+
+        best: Optional[_Sighting] = None
+        best_camera = ""
+        for camera, window in neighbors:
+            sightings = self._sightings.get((camera, event_type))
+            if not sightings:
+                continue
+            # Newest first; stop at the first sighting outside the transit window.
+            for sighting in reversed(sightings.values()):
+                if ts - sighting.last_seen > window:
+                    break
+                if camera_id in sighting.claimed:
+                    continue
+                if best is None or sighting.last_seen > best.last_seen:
+                    best = sighting
+                    best_camera = camera
+                break
+        if best is None:
+            return None
+        best.claimed += (camera_id,)
+        return best_camera, best.track
+
+    def _purge(self, sightings: "OrderedDict[Any, _Sighting]", now: float) -> None:
+        while sightings:
+            event_id, sighting = next(iter(sightings.items()))
+            if now - sighting.last_seen <= self._retain:
+                break
+            del sightings[event_id]
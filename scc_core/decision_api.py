@@ -0,0 +1,232 @@
+"""Read API over recent SCC decisions.
+
+``DecisionRing`` keeps the most recent N decisions in memory so "last hour"
+style queries never touch disk; older ranges fall back to the event journal
+when one is configured. ``DecisionQueryServer`` serves queries as one JSON
+object per line over a Unix domain socket so the UI (a separate process) can
+read history without importing SCC.
+
+Request (all keys optional)::
+
+    {"camera_id": "front_gate", "event_type": "person_detected",
+     "start": 1767866400.0, "end": 1767870000.0, "limit": 50, "cursor": "..."}
+
+Response::
+
+    {"items": [<decision summary + "epoch">, ...], "next_cursor": "..." | null}
+
+Items are newest first. ``next_cursor`` is opaque; pass it back to get the
+next (older) page with the same filters. Items from Frigate carry ``event_id``;
+every item carries its rule ``actions`` and ``seq``, a number assigned at
+emission that orders decisions sharing a timestamp.
+
+Queries without ``start``, or starting before the ring's oldest decision, are
+answered from the journal (when one is configured), so history from before a
+restart stays visible.
+
+When snapshots are enabled, ``{"snapshot": "<event_id>"}`` returns the cached
+image's path (``{"path": "...", "bytes": N}``) or an error if it is not cached.
+"""
+
+from __future__ import annotations
+
+import base64
+import itertools
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .events import AnyEvent, event_epoch, event_from_record
+from .journal import EventJournal
+from .snapshots import SnapshotCache, snapshot_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# (epoch, camera_id, event_type, seq): ``seq`` is unique per emitted decision and stored
+# with it in the ring and the journal, so a key never changes with the page or the source.
+_SortKey = Tuple[float, str, str, int]
+
+
+def _sort_key(item: Dict[str, Any]) -> _SortKey:
+    return (item["epoch"], item["camera_id"], item["event_type"], item["seq"])
+
+
+def _decision_item(decision: AnyEvent, actions: Sequence[str], seq: int) -> Dict[str, Any]:
+    item = decision.summary()
+    item["epoch"] = event_epoch(decision)
+    event_id = decision.meta.get("event_id")
+    if event_id is not None:
+        item["event_id"] = event_id
+    item["actions"] = list(actions)
+    item["seq"] = seq
+    return item
+
+
+def encode_cursor(key: _SortKey) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> _SortKey:
+    try:
+        epoch, camera_id, event_type, seq = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (float(epoch), str(camera_id), str(event_type), int(seq))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+class DecisionRing:
+    """Fixed-size in-memory history of emitted decisions."""
+
+    def __init__(self, size: int = 10_000, journal: Optional[EventJournal] = None):
+        self._items: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._journal = journal
+        # Counts up from the start time in microseconds, so numbers never repeat across restarts.
+        self._seq = itertools.count(time.time_ns() // 1000)
+
+    def add(self, decision: AnyEvent, actions: Sequence[str] = ()) -> int:
+        """Keep ``decision`` and return its ``seq``; journal it with the same number."""
+
+        seq = next(self._seq)
+        item = _decision_item(decision, actions, seq)
+        with self._lock:
+            self._items.append(item)
+        return seq
+
+    def query(
+        self,
+        camera_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: int = DEFAULT_LIMIT,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        before = decode_cursor(cursor) if cursor else None
+        if before is not None and (end is None or before[0] < end):
+            # Later pages never need anything newer than the last item already returned.
+            end = before[0]
+
+        with self._lock:
+            snapshot = list(self._items)
+        oldest = min((item["epoch"] for item in snapshot), default=None)
+
+        candidates: Iterable[Dict[str, Any]] = snapshot
+        # Anything before the ring's oldest decision (e.g. from before a restart) is only in the journal.
+        if self._journal is not None and (start is None or oldest is None or start < oldest):
+            candidates = self._from_journal(camera_id, start, end)
+
+        matches = [
+            (key, item)
+            for key, item in ((_sort_key(item), item) for item in candidates)
+            if (camera_id is None or item["camera_id"] == camera_id)
+            and (event_type is None or item["event_type"] == event_type)
+            and (start is None or item["epoch"] >= start)
+            and (end is None or item["epoch"] <= end)
+            and (before is None or key < before)
+        ]
+        matches.sort(key=lambda match: match[0], reverse=True)
+        page = matches[:limit]
+        next_cursor = encode_cursor(page[-1][0]) if len(matches) > limit else None
+        return {"items": [item for _, item in page], "next_cursor": next_cursor}
+
+    def _from_journal(
+        self, camera_id: Optional[str], start: Optional[float], end: Optional[float]
+    ) -> List[Dict[str, Any]]:
+        assert self._journal is not None
+        items = []
+        for record in self._journal.query(start=start, end=end, camera_id=camera_id, kind="decision"):
+            event = event_from_record(record, compact=True)
+            # Decisions journaled before sequence numbers existed sort first among equal timestamps.
+            items.append(_decision_item(event, record.get("actions") or (), int(record.get("seq", 0))))
+        return items
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "DecisionQueryServer"
+
+    def handle(self) -> None:
+        for raw in self.rfile:
+            try:
+                request = json.loads(raw) if raw.strip() else {}
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object")
+                if "snapshot" in request:
+                    response = self.server.snapshot(str(request["snapshot"]))
+                else:
+                    response = self.server.ring.query(
+                        camera_id=request.get("camera_id"),
+                        event_type=request.get("event_type"),
+                        start=_optional_float(request.get("start")),
+                        end=_optional_float(request.get("end")),
+                        limit=int(request.get("limit", DEFAULT_LIMIT)),
+                        cursor=request.get("cursor"),
+                    )
+            except (ValueError, TypeError) as exc:
+                response = {"error": str(exc)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+def _optional_float(raw: Any) -> Optional[float]:
+    return None if raw is None else float(raw)
+
+
+class DecisionQueryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serve :class:`DecisionRing` queries on a Unix socket in a background thread."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        socket_path: Path,
+        ring: DecisionRing,
+        snapshots: Optional[SnapshotCache] = None,
+        snapshot_kind: str = "snapshot",
+    ):
+        self.socket_path = Path(socket_path).expanduser()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        self.ring = ring
+        self.snapshots = snapshots
+        self.snapshot_kind = snapshot_kind
+        super().__init__(str(self.socket_path), _Handler)
+        os.chmod(self.socket_path, 0o660)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.serve_forever, name="scc-decision-api", daemon=True)
+        self._thread.start()
+        logger.info("Decision query API listening", extra={"socket": str(self.socket_path)})
+
+    def snapshot(self, event_id: str) -> Dict[str, Any]:
+        if self.snapshots is None:
+            raise ValueError("Snapshots are not enabled")
+        path = self.snapshots.get(snapshot_key(event_id, self.snapshot_kind))
+        try:
+            size = path.stat().st_size if path is not None else None
+        except OSError:
+            # Evicted between the lookup and the stat.
+            size = None
+        if path is None or size is None:
+            raise ValueError(f"No cached snapshot for {event_id!r}")
+        return {"path": str(path), "bytes": size}
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
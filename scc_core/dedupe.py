@@ -1,27 +1,84 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional, Tuple
+import heapq
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
-from .events import Event
+from .events import AnyEvent, event_epoch, event_from_record, event_to_record
+from .metrics import SccMetrics
+
+# (camera_id, event_type), plus the zone when zone keys are enabled.
+IncidentKey = Tuple[str, ...]
+
+
+@dataclass
+class AdaptiveWindow:
+    """Widen a camera's windows while its event rate is above ``threshold_per_minute``.
+
+    The rate is counted per whole minute; for the following minute the camera's
+    windows are scaled by ``rate / threshold``, capped at ``max_factor``.
+    """
+
+    threshold_per_minute: float = 30.0
+    max_factor: float = 4.0
 
 
 @dataclass
 class _Incident:
-    best_event: Event
-    first_seen: datetime
-    last_updated: datetime
+    best_event: AnyEvent
+    first_seen: float
+    last_updated: float
+    window: float
+    # Frigate event ids that may emit for this incident: the object that opened (or first confirmed) it.
+    event_ids: Set[Any] = field(default_factory=set)
+    # Set when the owning object ends; the next event opens a fresh incident.
+    released: bool = False
+
+
+@dataclass
+class _CameraRate:
+    minute: int
+    count: int = 0
+    factor: float = 1.0
 
 
 class DedupeAggregator:
-    """Aggregate noisy detector events into single SCC incidents."""
+    """Aggregate noisy detector events into single SCC incidents.
+
+    Accepts both :class:`~scc_core.events.Event` and
+    :class:`~scc_core.events.CompactEvent`; incident times are kept as UTC epochs.
 
-    def __init__(self, window_seconds: int = 15):
+    ``windows`` overrides ``window_seconds`` per ``"camera"``,
+    ``"camera/event_type"`` or ``"*/event_type"`` (most specific first).
+    With ``zone_keys``, incidents are also keyed on the event's
+    ``current_zones``, so an object in the driveway and one in the yard of the
+    same camera are separate incidents.
+    """
+
+    def __init__(
+        self,
+        window_seconds: int = 15,
+        metrics: Optional[SccMetrics] = None,
+        windows: Optional[Dict[str, float]] = None,
+        adaptive: Optional[AdaptiveWindow] = None,
+        zone_keys: bool = False,
+    ):
+        self._metrics = metrics
+        self._zone_keys = zone_keys
         self.window = timedelta(seconds=window_seconds)
-        self._incidents: Dict[Tuple[str, str], _Incident] = {}
+        self._window_s = float(window_seconds)
+        self._windows: Dict[str, float] = dict(windows or {})
+        self._key_windows: Dict[Tuple[str, str], float] = {}
+        self._adaptive = adaptive
+        self._rates: Dict[str, _CameraRate] = {}
+        self._incidents: Dict[IncidentKey, _Incident] = {}
+        # Min-heap of (deadline, key). Holds at most one entry per live incident;
+        # entries go stale when an incident is refreshed and are re-scheduled lazily.
+        self._expiry: List[Tuple[float, IncidentKey]] = []
 
-    def process(self, event: Event) -> Optional[Event]:
+    def process(self, event: AnyEvent) -> Optional[AnyEvent]:
         """
         Consume an event and decide whether to emit a notification-worthy incident.
 
@@ -29,44 +86,186 @@ class DedupeAggregator:
         - Reolink is early-signal only (NO fallback alerts).
         - Frigate is authoritative; SCC emits only when a Frigate event arrives.
         - Within the dedupe window, prefer Frigate as the incident representative.
+        - A different Frigate object arriving inside an open incident is merged into
+          it and emits nothing. Merged objects do not refresh the incident, so a
+          long-lived one (a parked car) cannot hold it open; only the object that
+          opened the incident keeps it alive, and its ``end`` releases it.
         """
-        ts = event.ts if event.ts.tzinfo else datetime.now(timezone.utc)
+        ts = event_epoch(event)
         self._purge(ts)
 
         key = (event.camera_id, event.event_type)
+        window = self._key_windows.get(key)
+        if window is None:
+            window = self._resolve_window(key)
+        if self._adaptive is not None:
+            window *= self._rate_factor(event.camera_id, ts)
+        if self._zone_keys:
+            key = self._zone_key(event)
         inc = self._incidents.get(key)
 
-        expired = inc is None or (ts - inc.last_updated > self.window)
+        event_id = event.meta.get("event_id") if event.source == "frigate" else None
+        merged = False
+        expired = inc is None or inc.released or (ts - inc.last_updated > inc.window)
         if expired:
-            inc = _Incident(best_event=event, first_seen=ts, last_updated=ts)
+            if inc is None:
+                heapq.heappush(self._expiry, (ts + window, key))
+            inc = _Incident(best_event=event, first_seen=ts, last_updated=ts, window=window)
             self._incidents[key] = inc
+            if self._metrics is not None:
+                self._metrics.incidents_opened.labels(event.camera_id).inc()
         else:
-            inc.last_updated = ts
-            if self._is_preferred(event, inc.best_event):
-                inc.best_event = event
+            if self._metrics is not None:
+                self._metrics.dedupe_hits.labels(event.camera_id).inc()
+            merged = event_id is not None and bool(inc.event_ids) and event_id not in inc.event_ids
+            if not merged:
+                inc.last_updated = ts
+                inc.window = window
+                if self._is_preferred(event, inc.best_event):
+                    inc.best_event = event
+        if event_id is not None and not inc.event_ids:
+            inc.event_ids.add(event_id)
 
         # NO fallback alerts: never emit based on Reolink-only signals.
-        if event.source != "frigate":
+        if event.source != "frigate" or merged:
             return None
 
+        if event.meta.get("frigate_type") == "end":
+            inc.released = True
         # Frigate confirms; emit the preferred representative (frigate-preferred).
         return inc.best_event
 
-    def _purge(self, now: datetime) -> None:
-        expired_keys = [
-            key
-            for key, inc in self._incidents.items()
-            if now - inc.last_updated > self.window
+    def set_window(
+        self,
+        window_seconds: int,
+        windows: Optional[Dict[str, float]] = None,
+        adaptive: Optional[AdaptiveWindow] = None,
+    ) -> None:
+        """Change the dedupe windows, keeping every live incident.
+
+        Open incidents take their key's new window and expiry deadlines are
+        rescheduled, so a shorter window takes effect at once.
+        """
+
+        self.window = timedelta(seconds=window_seconds)
+        self._window_s = float(window_seconds)
+        self._windows = dict(windows or {})
+        self._key_windows = {}
+        self._adaptive = adaptive
+        if adaptive is None:
+            self._rates = {}
+        for key, inc in self._incidents.items():
+            inc.window = self._resolve_window((key[0], key[1]))
+        self._expiry = [(inc.last_updated + inc.window, key) for key, inc in self._incidents.items()]
+        heapq.heapify(self._expiry)
+
+    @staticmethod
+    def _zone_key(event: AnyEvent) -> IncidentKey:
+        zones = event.meta.get("current_zones")
+        return (event.camera_id, event.event_type, ",".join(sorted(zones)) if zones else "")
+
+    def _resolve_window(self, key: Tuple[str, str]) -> float:
+        camera_id, event_type = key
+        windows = self._windows
+        window = windows.get(f"{camera_id}/{event_type}")
+        if window is None:
+            window = windows.get(camera_id)
+        if window is None:
+            window = windows.get(f"*/{event_type}")
+        window = self._window_s if window is None else float(window)
+        self._key_windows[key] = window
+        return window
+
+    def _rate_factor(self, camera_id: str, ts: float) -> float:
+        adaptive = self._adaptive
+        assert adaptive is not None
+        minute = int(ts // 60)
+        rate = self._rates.get(camera_id)
+        if rate is None:
+            rate = self._rates[camera_id] = _CameraRate(minute=minute)
+        elif minute != rate.minute:
+            # A gap of more than a minute means the camera went quiet; drop back to the base window.
+            busy = rate.count if minute == rate.minute + 1 else 0
+            rate.factor = min(adaptive.max_factor, max(1.0, busy / adaptive.threshold_per_minute))
+            rate.minute = minute
+            rate.count = 0
+        rate.count += 1
+        return rate.factor
+
+    def _purge(self, now: float) -> None:
+        """Drop incidents idle for longer than the window, in deadline order.
+
+        This only pays off with many live incidents: at a few dozen or fewer the
+        heap bookkeeping costs about what a full scan did (sometimes a little
+        more), and the gain grows with the count (see ``scripts/bench_dedupe.py``).
+        """
+
+        heap = self._expiry
+        while heap and heap[0][0] < now:
+            _, key = heapq.heappop(heap)
+            inc = self._incidents.get(key)
+            if inc is None:
+                continue
+            deadline = inc.last_updated + inc.window
+            if inc.released or deadline < now:
+                del self._incidents[key]
+            else:
+                # Refreshed since it was scheduled; push it back at its real deadline.
+                heapq.heappush(heap, (deadline, key))
+
+    def export_state(self) -> List[Dict[str, Any]]:
+        """Return the live incidents as JSON-safe records for a snapshot."""
+
+        return [
+            {
+                "best_event": event_to_record(inc.best_event),
+                "first_seen": inc.first_seen,
+                "last_updated": inc.last_updated,
+                "event_ids": list(inc.event_ids),
+            }
+            for inc in self._incidents.values()
+            if not inc.released
         ]
-        for key in expired_keys:
-            del self._incidents[key]
+
+    def restore_state(
+        self,
+        records: Iterable[Dict[str, Any]],
+        now: Optional[float] = None,
+        compact: bool = False,
+    ) -> int:
+        """Load incidents from :meth:`export_state`, skipping any already past the window.
+
+        Returns the number of incidents restored.
+        """
+
+        now = time.time() if now is None else now
+        restored = 0
+        for record in records:
+            last_updated = float(record["last_updated"])
+            event = event_from_record(record["best_event"], compact=compact)
+            window_key = (event.camera_id, event.event_type)
+            window = self._key_windows.get(window_key) or self._resolve_window(window_key)
+            if now - last_updated > window:
+                continue
+            key = self._zone_key(event) if self._zone_keys else window_key
+            if key not in self._incidents:
+                heapq.heappush(self._expiry, (last_updated + window, key))
+            self._incidents[key] = _Incident(
+                best_event=event,
+                first_seen=float(record["first_seen"]),
+                last_updated=last_updated,
+                window=window,
+                event_ids=set(record.get("event_ids", ())),
+            )
+            restored += 1
+        return restored
 
     @staticmethod
-    def _is_preferred(candidate: Event, current: Event) -> bool:
+    def _is_preferred(candidate: AnyEvent, current: AnyEvent) -> bool:
         if candidate.source == current.source:
-            return candidate.ts >= current.ts
+            return event_epoch(candidate) >= event_epoch(current)
         if candidate.source == "frigate":
             return True
         if current.source == "frigate":
             return False
-        return candidate.ts >= current.ts
+        return event_epoch(candidate) >= event_epoch(current)
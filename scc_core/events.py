@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import json
+import sys
+import time
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Union
 
 
 @dataclass
@@ -19,10 +23,144 @@ class Event:
 
     def summary(self) -> Dict[str, Any]:
         """Return a compact summary for logging or notifications."""
-        return {
+        summary = {
             "camera_id": self.camera_id,
             "event_type": self.event_type,
             "chosen_source": self.source,
             "confidence": self.confidence,
             "ts": self.ts.isoformat(),
         }
+        _add_object_ids(summary, self.meta)
+        return summary
+
+    def summary_json(self) -> bytes:
+        """Return the summary serialized as a UTF-8 JSON line body."""
+        return json.dumps(self.summary()).encode("utf-8")
+
+
+_EMPTY_META: Mapping[str, Any] = MappingProxyType({})
+
+
+def _add_object_ids(summary: Dict[str, Any], meta: Mapping[str, Any]) -> None:
+    # The detector's object id and message type let consumers act once per object.
+    for key in ("event_id", "frigate_type"):
+        if key in meta:
+            summary[key] = meta[key]
+
+
+class CompactEvent:
+    """Slotted, allocation-light counterpart of :class:`Event` for the ingest hot path.
+
+    ``ts`` is a float epoch (UTC), the identifying strings are interned, ``meta``
+    is only allocated when there is something to store (reads of an empty meta
+    return a shared read-only mapping), and the serialized summary is cached on
+    first use. Treat instances as immutable once built.
+    """
+
+    __slots__ = ("source", "camera_id", "event_type", "ts", "confidence", "snapshot_url", "_meta", "_summary_json")
+
+    def __init__(
+        self,
+        source: str,
+        camera_id: str,
+        event_type: str,
+        ts: float,
+        confidence: Optional[float] = None,
+        snapshot_url: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ):
+        self.source = sys.intern(source)
+        self.camera_id = sys.intern(camera_id)
+        self.event_type = sys.intern(event_type)
+        self.ts = float(ts)
+        self.confidence = confidence
+        self.snapshot_url = snapshot_url
+        self._meta = meta or None
+        self._summary_json: Optional[bytes] = None
+
+    @property
+    def meta(self) -> Mapping[str, Any]:
+        return self._meta if self._meta is not None else _EMPTY_META
+
+    def set_meta(self, key: str, value: Any) -> None:
+        if self._meta is None:
+            self._meta = {}
+        self._meta[key] = value
+        self._summary_json = None
+
+    def summary(self) -> Dict[str, Any]:
+        """Return a compact summary for logging or notifications."""
+        summary = {
+            "camera_id": self.camera_id,
+            "event_type": self.event_type,
+            "chosen_source": self.source,
+            "confidence": self.confidence,
+            "ts": datetime.fromtimestamp(self.ts, tz=timezone.utc).isoformat(),
+        }
+        _add_object_ids(summary, self.meta)
+        return summary
+
+    def summary_json(self) -> bytes:
+        """Return the cached summary serialized as a UTF-8 JSON line body."""
+        if self._summary_json is None:
+            self._summary_json = json.dumps(self.summary()).encode("utf-8")
+        return self._summary_json
+
+    def __repr__(self) -> str:
+        return (
+            f"CompactEvent(source={self.source!r}, camera_id={self.camera_id!r}, event_type={self.event_type!r}, "
+            f"ts={self.ts!r}, confidence={self.confidence!r}, snapshot_url={self.snapshot_url!r}, meta={dict(self.meta)!r})"
+        )
+
+
+AnyEvent = Union[Event, CompactEvent]
+
+
+def event_epoch(event: AnyEvent) -> float:
+    """Return the event time as a UTC epoch; naive datetimes count as "now"."""
+
+    ts = event.ts
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    if ts.tzinfo:
+        return ts.timestamp()
+    return time.time()
+
+
+def event_to_record(event: AnyEvent) -> Dict[str, Any]:
+    """Serialize an event to a JSON-safe dict (``ts`` as a UTC epoch)."""
+
+    return {
+        "source": event.source,
+        "camera_id": event.camera_id,
+        "event_type": event.event_type,
+        "ts": event_epoch(event),
+        "confidence": event.confidence,
+        "snapshot_url": event.snapshot_url,
+        "meta": dict(event.meta),
+    }
+
+
+def event_from_record(record: Mapping[str, Any], compact: bool = False) -> AnyEvent:
+    """Rebuild an event written by :func:`event_to_record`."""
+
+    meta = dict(record.get("meta") or {})
+    if compact:
+        return CompactEvent(
+            source=record["source"],
+            camera_id=record["camera_id"],
+            event_type=record["event_type"],
+            ts=record["ts"],
+            confidence=record.get("confidence"),
+            snapshot_url=record.get("snapshot_url"),
+            meta=meta or None,
+        )
+    return Event(
+        source=record["source"],
+        camera_id=record["camera_id"],
+        event_type=record["event_type"],
+        ts=datetime.fromtimestamp(record["ts"], tz=timezone.utc),
+        confidence=record.get("confidence"),
+        snapshot_url=record.get("snapshot_url"),
+        meta=meta,
+    )
@@ -0,0 +1,406 @@
+"""Segmented, append-only journal of normalized events and decisions.
+
+Records are compact JSON lines appended to numbered segment files
+(``00000001.jsonl``). Segments roll over at ``segment_bytes`` or once they
+span ``segment_seconds``, and whole segments expire by age
+(``retention_seconds``) or total size (``max_total_bytes``).
+
+Next to every segment is a sparse index (``00000001.idx``, also JSONL) with one
+entry per block of ``index_every`` records. An entry holds the block's byte
+range, its min/max timestamp, the running max timestamp across the segment
+(monotonic, so it can be binary searched) and the cameras in the block.
+A query binary searches to the first block that can hold the start time,
+skips blocks without the requested camera, and parses only the blocks it
+keeps, read through ``mmap``. Event timestamps can arrive slightly out of
+order; ``max_skew`` bounds how far past ``end`` the scan keeps looking.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import mmap
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
+
+from .events import AnyEvent, event_to_record
+
+logger = logging.getLogger(__name__)
+
+_SEPARATORS = (",", ":")
+
+
+@dataclass
+class _Block:
+    start: int
+    end: int
+    min_ts: float
+    max_ts: float
+    running_max: float
+    cameras: Set[str]
+
+    def to_json(self) -> bytes:
+        return json.dumps(
+            {
+                "s": self.start,
+                "e": self.end,
+                "lo": self.min_ts,
+                "hi": self.max_ts,
+                "cm": self.running_max,
+                "cams": sorted(self.cameras),
+            },
+            separators=_SEPARATORS,
+        ).encode("utf-8")
+
+    @classmethod
+    def from_json(cls, raw: Dict[str, Any]) -> "_Block":
+        return cls(raw["s"], raw["e"], raw["lo"], raw["hi"], raw["cm"], set(raw["cams"]))
+
+
+@dataclass
+class _Segment:
+    seq: int
+    data_path: Path
+    index_path: Path
+    blocks: List[_Block] = field(default_factory=list)
+    # running_max of each block, kept alongside for bisect.
+    marks: List[float] = field(default_factory=list)
+    size: int = 0
+    first_ts: Optional[float] = None
+
+    def add_block(self, block: _Block) -> None:
+        self.blocks.append(block)
+        self.marks.append(block.running_max)
+
+    @property
+    def max_ts(self) -> Optional[float]:
+        return self.blocks[-1].running_max if self.blocks else None
+
+
+@dataclass
+class JournalConfig:
+    path: Path
+    segment_bytes: int = 16 * 1024 * 1024
+    segment_seconds: float = 3600.0
+    retention_seconds: float = 7 * 24 * 3600.0
+    max_total_bytes: int = 1024 * 1024 * 1024
+
+
+class EventJournal:
+    """Append events/decisions and answer time-range and camera queries."""
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_bytes: int = 16 * 1024 * 1024,
+        segment_seconds: float = 3600.0,
+        retention_seconds: float = 7 * 24 * 3600.0,
+        max_total_bytes: int = 1024 * 1024 * 1024,
+        index_every: int = 64,
+        max_skew: float = 5.0,
+    ):
+        self.directory = Path(directory).expanduser()
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.retention_seconds = retention_seconds
+        self.max_total_bytes = max_total_bytes
+        self.index_every = index_every
+        self.max_skew = max_skew
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._segments: List[_Segment] = []
+        self._open_block: Optional[_Block] = None
+        self._open_count = 0
+        self._load()
+        self._data_fh = open(self._active.data_path, "ab")
+        self._index_fh = open(self._active.index_path, "ab")
+
+    @classmethod
+    def from_config(cls, config: JournalConfig) -> "EventJournal":
+        return cls(
+            config.path,
+            segment_bytes=config.segment_bytes,
+            segment_seconds=config.segment_seconds,
+            retention_seconds=config.retention_seconds,
+            max_total_bytes=config.max_total_bytes,
+        )
+
+    # -- writing -----------------------------------------------------------------
+
+    def append(self, kind: str, event: AnyEvent, fields: Optional[Dict[str, Any]] = None) -> None:
+        record = event_to_record(event)
+        record["kind"] = kind
+        if fields:
+            record.update(fields)
+        line = json.dumps(record, separators=_SEPARATORS).encode("utf-8") + b"\n"
+        ts = record["ts"]
+        camera_id = record["camera_id"]
+
+        with self._lock:
+            segment = self._active
+            if self._should_roll(segment, ts, len(line)):
+                self._roll(ts)
+                segment = self._active
+
+            offset = segment.size
+            self._data_fh.write(line)
+            segment.size += len(line)
+            if segment.first_ts is None:
+                segment.first_ts = ts
+
+            block = self._open_block
+            if block is None:
+                running = max(ts, segment.max_ts) if segment.max_ts is not None else ts
+                self._open_block = _Block(offset, segment.size, ts, ts, running, {camera_id})
+                self._open_count = 1
+            else:
+                block.end = segment.size
+                block.min_ts = min(block.min_ts, ts)
+                block.max_ts = max(block.max_ts, ts)
+                block.running_max = max(block.running_max, ts)
+                block.cameras.add(camera_id)
+                self._open_count += 1
+            if self._open_count >= self.index_every:
+                self._close_block()
+
+    def append_event(self, event: AnyEvent) -> None:
+        self.append("event", event)
+
+    def append_decision(self, event: AnyEvent, actions: Sequence[str] = (), seq: Optional[int] = None) -> None:
+        """Journal an emitted decision with its rule actions and decision-API sequence number."""
+
+        fields: Dict[str, Any] = {}
+        if actions:
+            fields["actions"] = list(actions)
+        if seq is not None:
+            fields["seq"] = seq
+        self.append("decision", event, fields)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._data_fh.flush()
+            self._index_fh.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_block()
+            self._data_fh.close()
+            self._index_fh.close()
+
+    # -- querying ----------------------------------------------------------------
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        camera_id: Optional[str] = None,
+        kind: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield records with ``start <= ts <= end`` in journal order."""
+
+        with self._lock:
+            if not self._data_fh.closed:
+                self._data_fh.flush()
+            plan = [(segment.data_path, list(self._candidate_blocks(segment, start, end, camera_id)))
+                    for segment in self._segments]
+            block = self._open_block
+            if block is not None:
+                # Appends keep extending the open block; scan the range flushed so far, fixed under the lock.
+                plan[-1][1].append(
+                    _Block(block.start, block.end, block.min_ts, block.max_ts, block.running_max, set(block.cameras))
+                )
+
+        remaining = limit
+        for data_path, blocks in plan:
+            if not blocks:
+                continue
+            for record in self._scan(data_path, blocks, start, end, camera_id, kind):
+                yield record
+                if remaining is not None:
+                    remaining -= 1
+                    if remaining <= 0:
+                        return
+
+    def _candidate_blocks(
+        self, segment: _Segment, start: Optional[float], end: Optional[float], camera_id: Optional[str]
+    ) -> Iterator[_Block]:
+        blocks = segment.blocks
+        first = 0
+        if start is not None:
+            # running_max is non-decreasing: everything before this block is older than ``start``.
+            first = bisect.bisect_left(segment.marks, start)
+        for block in blocks[first:]:
+            if end is not None and block.min_ts > end + self.max_skew:
+                break
+            if end is not None and block.min_ts > end:
+                continue
+            if start is not None and block.max_ts < start:
+                continue
+            if camera_id is not None and camera_id not in block.cameras:
+                continue
+            yield block
+
+    @staticmethod
+    def _scan(
+        data_path: Path,
+        blocks: List[_Block],
+        start: Optional[float],
+        end: Optional[float],
+        camera_id: Optional[str],
+        kind: Optional[str],
+    ) -> Iterator[Dict[str, Any]]:
+        try:
+            fh = open(data_path, "rb")
+        except FileNotFoundError:
+            return  # expired while the query was running
+        with fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                return
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for block in blocks:
+                    for line in mapped[block.start : block.end].splitlines():
+                        record = json.loads(line)
+                        ts = record["ts"]
+                        if start is not None and ts < start:
+                            continue
+                        if end is not None and ts > end:
+                            continue
+                        if camera_id is not None and record["camera_id"] != camera_id:
+                            continue
+                        if kind is not None and record.get("kind") != kind:
+                            continue
+                        yield record
+
+    # -- segment management ------------------------------------------------------
+
+    @property
+    def _active(self) -> _Segment:
+        return self._segments[-1]
+
+    def _should_roll(self, segment: _Segment, ts: float, size: int) -> bool:
+        if segment.size == 0:
+            return False
+        if segment.size + size > self.segment_bytes:
+            return True
+        return segment.first_ts is not None and ts - segment.first_ts > self.segment_seconds
+
+    def _roll(self, now: float) -> None:
+        self._close_block()
+        self._data_fh.close()
+        self._index_fh.close()
+        self._segments.append(self._new_segment(self._active.seq + 1))
+        self._data_fh = open(self._active.data_path, "ab")
+        self._index_fh = open(self._active.index_path, "ab")
+        self._expire(now)
+
+    def _close_block(self) -> None:
+        block = self._open_block
+        if block is None:
+            return
+        self._active.add_block(block)
+        self._index_fh.write(block.to_json() + b"\n")
+        self._data_fh.flush()
+        self._index_fh.flush()
+        self._open_block = None
+        self._open_count = 0
+
+    def _expire(self, now: float) -> None:
+        total = sum(segment.size for segment in self._segments)
+        while len(self._segments) > 1:
+            oldest = self._segments[0]
+            too_old = oldest.max_ts is not None and now - oldest.max_ts > self.retention_seconds
+            if not too_old and total <= self.max_total_bytes:
+                break
+            total -= oldest.size
+            for path in (oldest.data_path, oldest.index_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            self._segments.pop(0)
+            logger.info("Expired journal segment", extra={"segment": oldest.seq})
+
+    def _new_segment(self, seq: int) -> _Segment:
+        return _Segment(
+            seq=seq,
+            data_path=self.directory / f"{seq:08d}.jsonl",
+            index_path=self.directory / f"{seq:08d}.idx",
+        )
+
+    def _load(self) -> None:
+        seqs = sorted(int(path.stem) for path in self.directory.glob("*.jsonl") if path.stem.isdigit())
+        for seq in seqs:
+            segment = self._new_segment(seq)
+            if segment.index_path.exists():
+                torn = False
+                with open(segment.index_path, "rb") as fh:
+                    for raw in fh:
+                        try:
+                            segment.add_block(_Block.from_json(json.loads(raw)))
+                        except (ValueError, KeyError):
+                            torn = True
+                            break
+                if torn:
+                    # Rewrite without the torn trailing entry so later appends stay parseable.
+                    segment.index_path.write_bytes(b"".join(block.to_json() + b"\n" for block in segment.blocks))
+            segment.size = segment.data_path.stat().st_size
+            if segment.blocks:
+                segment.first_ts = segment.blocks[0].min_ts
+            self._segments.append(segment)
+
+        if not self._segments:
+            self._segments.append(self._new_segment(1))
+            return
+        self._recover_tail(self._segments[-1])
+
+    def _recover_tail(self, segment: _Segment) -> None:
+        """Re-index records written after the last index entry and drop a torn final line."""
+
+        indexed_end = segment.blocks[-1].end if segment.blocks else 0
+        if segment.size <= indexed_end:
+            return
+        with open(segment.data_path, "rb") as fh:
+            fh.seek(indexed_end)
+            tail = fh.read()
+        complete = tail.rfind(b"\n") + 1
+        if complete < len(tail):
+            with open(segment.data_path, "r+b") as fh:
+                fh.truncate(indexed_end + complete)
+        segment.size = indexed_end + complete
+
+        offset = indexed_end
+        running = segment.max_ts
+        rebuilt: List[_Block] = []
+        count = 0
+        for line in tail[:complete].splitlines(keepends=True):
+            line_start, offset = offset, offset + len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            ts, camera_id = record["ts"], record["camera_id"]
+            running = ts if running is None else max(running, ts)
+            if not rebuilt or count >= self.index_every:
+                rebuilt.append(_Block(line_start, offset, ts, ts, running, {camera_id}))
+                count = 1
+                continue
+            block = rebuilt[-1]
+            block.end = offset
+            block.min_ts = min(block.min_ts, ts)
+            block.max_ts = max(block.max_ts, ts)
+            block.running_max = running
+            block.cameras.add(camera_id)
+            count += 1
+
+        with open(segment.index_path, "ab") as fh:
+            for block in rebuilt:
+                segment.add_block(block)
+                fh.write(block.to_json() + b"\n")
+        if segment.first_ts is None and segment.blocks:
+            segment.first_ts = segment.blocks[0].min_ts
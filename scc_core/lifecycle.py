@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from .events import AnyEvent, event_epoch
+
+
+@dataclass
+class _Lifecycle:
+    top_score: Optional[float]
+    zones: FrozenSet[str]
+    sub_label: Any
+    last_seen: float
+    position_changes: Optional[int] = None
+
+
+class FrigateLifecycleTracker:
+    """Track Frigate events by id and flag only material lifecycle changes.
+
+    Frigate republishes the whole event on every ``update``. A message is
+    material when it is the first one seen for its id (normally ``new``), when
+    ``end`` arrives, or when it carries a better ``top_score``, a newly entered
+    zone, a new sub_label or a higher ``position_changes`` (a stationary object
+    moved again). Everything else is a repeat of what SCC already reported.
+    A score only counts as better when it beats the best so far by more than
+    ``min_score_gain``, so a score creeping up by a hundredth at a time does not
+    re-emit the object on every update.
+
+    With ``suppress_stationary``, nothing after the first message is material
+    while Frigate reports the object as ``stationary`` (a parked car), including
+    its ``end``.
+    """
+
+    def __init__(self, max_age_seconds: int = 3600, min_score_gain: float = 0.05, suppress_stationary: bool = True):
+        self.max_age = float(max_age_seconds)
+        self.min_score_gain = min_score_gain
+        self.suppress_stationary = suppress_stationary
+        # Insertion order doubles as last-seen order (entries are moved to the end).
+        self._tracked: "OrderedDict[Any, _Lifecycle]" = OrderedDict()
+
+    def observe(self, event: AnyEvent) -> bool:
+        """Record the event and return True if it is a material change."""
+
+        event_id = event.meta.get("event_id")
+        if event.source != "frigate" or event_id is None:
+            return True
+
+        ts = event_epoch(event)
+        self._purge(ts)
+
+        stationary = self.suppress_stationary and bool(event.meta.get("stationary"))
+        if event.meta.get("frigate_type") == "end":
+            state = self._tracked.pop(event_id, None)
+            return not (stationary and state is not None)
+
+        zones = frozenset(event.meta.get("entered_zones") or ())
+        sub_label = _sub_label_name(event.meta.get("sub_label"))
+        position_changes = event.meta.get("position_changes")
+        state = self._tracked.get(event_id)
+        if state is None:
+            self._tracked[event_id] = _Lifecycle(event.confidence, zones, sub_label, ts, position_changes)
+            return True
+
+        material = False
+        if position_changes is not None:
+            if state.position_changes is not None and position_changes > state.position_changes:
+                material = True
+            state.position_changes = position_changes
+        if event.confidence is not None and (
+            state.top_score is None or event.confidence > state.top_score + self.min_score_gain
+        ):
+            state.top_score = event.confidence
+            material = True
+        if not zones <= state.zones:
+            state.zones = state.zones | zones
+            material = True
+        if sub_label is not None and sub_label != state.sub_label:
+            state.sub_label = sub_label
+            material = True
+
+        state.last_seen = ts
+        self._tracked.move_to_end(event_id)
+        # State above is still updated, so the object is not re-announced for old news once it moves.
+        return material and not stationary
+
+    def export_state(self) -> List[Dict[str, Any]]:
+        """Return tracked events as JSON-safe records for a snapshot."""
+
+        return [
+            {
+                "event_id": event_id,
+                "top_score": state.top_score,
+                "zones": sorted(state.zones),
+                "sub_label": state.sub_label,
+                "last_seen": state.last_seen,
+                "position_changes": state.position_changes,
+            }
+            for event_id, state in self._tracked.items()
+        ]
+
+    def restore_state(self, records: Iterable[Dict[str, Any]], now: Optional[float] = None) -> int:
+        """Load records from :meth:`export_state`, skipping any older than ``max_age``."""
+
+        now = time.time() if now is None else now
+        restored = 0
+        for record in sorted(records, key=lambda item: item["last_seen"]):
+            last_seen = float(record["last_seen"])
+            if now - last_seen > self.max_age:
+                continue
+            self._tracked[record["event_id"]] = _Lifecycle(
+                top_score=record.get("top_score"),
+                zones=frozenset(record.get("zones") or ()),
+                sub_label=record.get("sub_label"),
+                last_seen=last_seen,
+                position_changes=record.get("position_changes"),
+            )
+            self._tracked.move_to_end(record["event_id"])
+            restored += 1
+        return restored
+
+    def _purge(self, now: float) -> None:
+        """Forget events whose ``end`` never arrived (broker drop, Frigate restart)."""
+
+        while self._tracked:
+            event_id, state = next(iter(self._tracked.items()))
+            if now - state.last_seen <= self.max_age:
+                break
+            del self._tracked[event_id]
+
+
+def _sub_label_name(raw: Any) -> Any:
+    # Newer Frigate releases publish sub_label as [name, score].
+    if isinstance(raw, (list, tuple)):
+        return raw[0] if raw else None
+    return raw
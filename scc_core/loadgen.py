@@ -0,0 +1,452 @@
+"""Synthetic multi-camera Frigate load.
+
+``FrigateLoadGenerator`` emulates up to 21 cameras publishing ``frigate/events``
+messages shaped like Frigate's own (``type`` plus ``before``/``after`` records):
+
+* objects arrive on each camera as a Poisson process (``objects_per_minute``),
+* each object sends ``new``, a stream of ``update`` messages at ``update_hz``
+  (exponential gaps) and ``end`` after an exponentially distributed dwell,
+* a share of objects has an update burst (``burst_factor`` times the rate for
+  ``burst_seconds``), and a share parks and turns stationary.
+
+Messages come out in time order as ``(arrival, topic, payload)`` tuples, the
+same shape as :func:`scc_core.replay.read_capture`, and a seed makes runs
+repeatable. The CLI sends them to one of three targets:
+
+* ``inproc`` (default) drives the single-process ``run_scc`` decision path
+  (adapter, lifecycle, correlation, dedupe, rules, rate limit, sinks) over an
+  in-memory broker and reports throughput, decisions, schedule lag and sink
+  stats. With ``--speed max`` it also reports how many cameras of this profile
+  the pipeline can sustain, which is the saturation point;
+* ``mqtt`` publishes to the configured broker for end-to-end runs against a
+  live ``run_scc``;
+* ``capture`` writes an SCC capture file for ``python -m scc_core.replay``.
+
+Usage::
+
+    python -m scc_core.loadgen --cameras 10 --duration 60 [--speed 1|10|max]
+        [--target inproc|mqtt|capture] [--out load.sccr] [--sinks null|config]
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import paho.mqtt.client as mqtt
+
+from scc_core.adapters import FrigateMqttAdapter, InMemoryBroker, MqttConfig
+from scc_core.config import AppConfig, load_app_config
+from scc_core.correlation import CameraCorrelator
+from scc_core.dedupe import DedupeAggregator
+from scc_core.lifecycle import FrigateLifecycleTracker
+from scc_core.ratelimit import DecisionRateLimiter, RateLimitConfig
+from scc_core.replay import CaptureWriter, StageTimings
+from scc_core.rules import RuleEngine
+from scc_core.run_scc import _on_event_factory
+from scc_core.sinks import SinkSet, build_sinks
+
+logger = logging.getLogger(__name__)
+
+MAX_CAMERAS = 21
+DEFAULT_CONFIG_PATH = Path("config/example_frigate.yml")
+
+Message = Tuple[float, str, bytes]
+
+
+@dataclass
+class LoadProfile:
+    cameras: int = 10
+    objects_per_minute: float = 2.0
+    dwell_seconds: float = 30.0
+    update_hz: float = 2.0
+    burst_probability: float = 0.2
+    burst_factor: float = 8.0
+    burst_seconds: float = 3.0
+    stationary_probability: float = 0.1
+    labels: Dict[str, float] = field(default_factory=lambda: {"person": 0.5, "car": 0.35, "truck": 0.1, "dog": 0.05})
+    zones: Tuple[str, ...] = ("entrance", "yard")
+    camera_names: Optional[List[str]] = None
+
+    def camera_ids(self) -> List[str]:
+        if not 1 <= self.cameras <= MAX_CAMERAS:
+            raise ValueError(f"cameras must be between 1 and {MAX_CAMERAS}")
+        names = list(self.camera_names or ())
+        names += [f"cam{index:02d}" for index in range(len(names) + 1, self.cameras + 1)]
+        return names[: self.cameras]
+
+
+@dataclass
+class _Object:
+    event_id: str
+    camera: str
+    label: str
+    start_epoch: float
+    end: float
+    burst_start: float
+    burst_end: float
+    park_at: float
+    score: float
+    top_score: float = 0.0
+    zones: List[str] = field(default_factory=list)
+    position_changes: int = 0
+    before: Optional[Dict[str, Any]] = None
+
+
+class FrigateLoadGenerator:
+    """Time-ordered synthetic ``frigate/events`` traffic for a :class:`LoadProfile`."""
+
+    def __init__(self, profile: LoadProfile, seed: Optional[int] = None, topic: str = "frigate/events"):
+        self.profile = profile
+        self.topic = topic
+        self._random = random.Random(seed)
+        labels = list(profile.labels.items())
+        self._label_names = [name for name, _ in labels]
+        self._label_weights = [weight for _, weight in labels]
+
+    def messages(self, duration: float, start_epoch: Optional[float] = None) -> Iterator[Message]:
+        """Yield ``(arrival epoch, topic, payload)`` for ``duration`` seconds of traffic."""
+
+        start_epoch = time.time() if start_epoch is None else start_epoch
+        rng = self._random
+        profile = self.profile
+        arrival_rate = profile.objects_per_minute / 60.0
+        seq = itertools.count()
+        # (offset, seq, kind, camera or object)
+        heap: List[Tuple[float, int, str, Any]] = []
+        if arrival_rate > 0:
+            for camera in profile.camera_ids():
+                heapq.heappush(heap, (rng.expovariate(arrival_rate), next(seq), "arrive", camera))
+
+        while heap:
+            offset, _, kind, subject = heapq.heappop(heap)
+            if offset > duration:
+                break
+            now = start_epoch + offset
+            if kind == "arrive":
+                heapq.heappush(heap, (offset + rng.expovariate(arrival_rate), next(seq), "arrive", subject))
+                obj = self._new_object(subject, offset, now)
+                yield now, self.topic, self._payload("new", obj, offset, now)
+                heapq.heappush(heap, (self._next_update(obj, offset), next(seq), "update", obj))
+            elif offset >= subject.end:
+                yield now, self.topic, self._payload("end", subject, offset, now)
+            else:
+                self._advance(subject, offset)
+                yield now, self.topic, self._payload("update", subject, offset, now)
+                heapq.heappush(heap, (self._next_update(subject, offset), next(seq), "update", subject))
+
+    def _new_object(self, camera: str, offset: float, now: float) -> _Object:
+        rng = self._random
+        profile = self.profile
+        dwell = max(1.0, rng.expovariate(1.0 / profile.dwell_seconds)) if profile.dwell_seconds > 0 else 1.0
+        burst_start = burst_end = -1.0
+        if rng.random() < profile.burst_probability:
+            burst_start = offset + rng.uniform(0.0, dwell)
+            burst_end = burst_start + profile.burst_seconds
+        park_at = offset + rng.uniform(0.2, 0.6) * dwell if rng.random() < profile.stationary_probability else -1.0
+        suffix = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(6))
+        score = rng.uniform(0.55, 0.8)
+        return _Object(
+            event_id=f"{now:.6f}-{suffix}",
+            camera=camera,
+            label=rng.choices(self._label_names, self._label_weights)[0],
+            start_epoch=now,
+            end=offset + dwell,
+            burst_start=burst_start,
+            burst_end=burst_end,
+            park_at=park_at,
+            score=score,
+            top_score=score,
+        )
+
+    def _next_update(self, obj: _Object, offset: float) -> float:
+        rate = self.profile.update_hz
+        if obj.burst_start <= offset < obj.burst_end:
+            rate *= self.profile.burst_factor
+        if rate <= 0:
+            return obj.end
+        return min(obj.end, offset + self._random.expovariate(rate))
+
+    def _advance(self, obj: _Object, offset: float) -> None:
+        rng = self._random
+        obj.score = min(0.99, max(0.3, obj.score + rng.gauss(0.0, 0.03)))
+        obj.top_score = max(obj.top_score, obj.score)
+        if obj.park_at < 0 or offset < obj.park_at:
+            if rng.random() < 0.3:
+                obj.position_changes += 1
+            if self.profile.zones and rng.random() < 0.02:
+                zone = rng.choice(self.profile.zones)
+                if zone not in obj.zones:
+                    obj.zones.append(zone)
+
+    def _payload(self, kind: str, obj: _Object, offset: float, now: float) -> bytes:
+        after = {
+            "id": obj.event_id,
+            "camera": obj.camera,
+            "label": obj.label,
+            "sub_label": None,
+            "score": round(obj.score, 4),
+            "top_score": round(obj.top_score, 4),
+            "frame_time": now,
+            "start_time": obj.start_epoch,
+            "end_time": now if kind == "end" else None,
+            "current_zones": list(obj.zones[-1:]),
+            "entered_zones": list(obj.zones),
+            "stationary": 0 <= obj.park_at <= offset,
+            "position_changes": obj.position_changes,
+            "has_snapshot": True,
+            "false_positive": False,
+        }
+        before = obj.before if obj.before is not None else after
+        obj.before = after
+        return json.dumps({"type": kind, "before": before, "after": after}).encode("utf-8")
+
+
+@dataclass
+class LoadReport:
+    target: str
+    cameras: int
+    messages: int
+    decisions: int
+    elapsed: float
+    offered_per_second: float
+    # Seconds each message was sent after its scheduled time (paced runs).
+    lag: StageTimings
+    sinks: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.elapsed if self.elapsed else float("inf")
+
+    def format(self, paced: bool) -> str:
+        lines = [
+            f"target:     {self.target}",
+            f"cameras:    {self.cameras}",
+            f"messages:   {self.messages}",
+        ]
+        if self.target == "inproc":
+            lines.append(f"decisions:  {self.decisions}")
+        lines += [
+            f"elapsed:    {self.elapsed:.3f}s",
+            f"offered:    {self.offered_per_second:,.0f} msg/s (generated average)",
+            f"throughput: {self.messages_per_second:,.0f} msg/s",
+        ]
+        if paced:
+            lines.append(
+                f"lag:        p50 {self.lag.percentile('lag', 50) * 1e3:.1f} ms, "
+                f"p99 {self.lag.percentile('lag', 99) * 1e3:.1f} ms, max {self.lag.percentile('lag', 100) * 1e3:.1f} ms"
+            )
+        elif self.offered_per_second > 0 and self.target == "inproc":
+            headroom = self.messages_per_second / self.offered_per_second
+            per_camera = self.offered_per_second / self.cameras
+            lines.append(
+                f"headroom:   {headroom:,.1f}x (saturates at ~{self.messages_per_second / per_camera:,.0f} cameras "
+                "of this profile)"
+            )
+        for stats in self.sinks:
+            lines.append(
+                f"sink {stats['sink']}: written {stats['written']}, dropped {stats['dropped']}, "
+                f"latency avg {stats['latency_seconds_avg'] * 1e3:.1f} ms"
+            )
+        return "\n".join(lines)
+
+
+def _paced(messages: List[Message], speed: Optional[float], lag: StageTimings) -> Iterator[Message]:
+    """Yield messages on their schedule (divided by ``speed``), recording how late each one is."""
+
+    if speed is None:
+        yield from messages
+        return
+    perf = time.perf_counter
+    first = messages[0][0] if messages else 0.0
+    wall_start = perf()
+    for message in messages:
+        due = (message[0] - first) / speed
+        delay = due - (perf() - wall_start)
+        if delay > 0:
+            time.sleep(delay)
+        lag.add("lag", max(0.0, -delay))
+        yield message
+
+
+def run_inproc(
+    messages: List[Message],
+    app_config: AppConfig,
+    sinks: SinkSet,
+    speed: Optional[float] = None,
+) -> Tuple[int, int, float, StageTimings]:
+    """Push messages through the single-process ``run_scc`` decision path; returns counts, elapsed and lag."""
+
+    aggregator = DedupeAggregator(
+        window_seconds=app_config.dedupe_window_seconds,
+        windows=app_config.dedupe_windows,
+        adaptive=app_config.dedupe_adaptive,
+        zone_keys=app_config.dedupe_zone_keys,
+    )
+    lifecycle = (
+        FrigateLifecycleTracker(
+            min_score_gain=app_config.min_score_gain, suppress_stationary=app_config.suppress_stationary
+        )
+        if app_config.lifecycle_tracking
+        else None
+    )
+    decisions = [0]
+    emit = sinks.emit
+
+    def _emit(line: bytes) -> None:
+        decisions[0] += 1
+        emit(line)
+
+    on_event = _on_event_factory(
+        aggregator,
+        lifecycle,
+        threading.Lock(),
+        emit=_emit,
+        rules=RuleEngine(app_config.rules),
+        limiter=DecisionRateLimiter(app_config.rate_limit or RateLimitConfig()),
+        correlator=CameraCorrelator(app_config.correlation) if app_config.correlation is not None else None,
+    )
+    # The adapter runs unmodified against an in-memory broker; delivery is synchronous, so
+    # every message has been through the decision path when publish returns.
+    broker = InMemoryBroker()
+    adapter = FrigateMqttAdapter(
+        mqtt_config=MqttConfig(host="loadgen", topic="frigate/#"),
+        compact_events=app_config.compact_events,
+        cameras=app_config.cameras,
+        labels=app_config.labels,
+        transport=broker.transport,
+    )
+    stop_event = threading.Event()
+    consumer = threading.Thread(target=adapter.start, args=(on_event, stop_event), name="scc-loadgen-adapter")
+    consumer.start()
+    while not adapter.connected and consumer.is_alive():
+        time.sleep(0.01)
+
+    lag = StageTimings()
+    count = 0
+    started = time.perf_counter()
+    try:
+        for _, topic, payload in _paced(messages, speed, lag):
+            broker.publish(topic, payload)
+            count += 1
+        elapsed = time.perf_counter() - started
+    finally:
+        stop_event.set()
+        consumer.join()
+    return count, decisions[0], elapsed, lag
+
+
+def run_mqtt(
+    messages: List[Message], mqtt_config: MqttConfig, speed: Optional[float]
+) -> Tuple[int, float, StageTimings]:
+    """Publish messages to the broker; returns count, elapsed and lag."""
+
+    client = mqtt.Client(client_id=f"{mqtt_config.client_id or 'scc'}-loadgen")
+    if mqtt_config.username:
+        client.username_pw_set(mqtt_config.username, mqtt_config.password)
+    connected = threading.Event()
+    client.on_connect = lambda client, userdata, flags, rc: connected.set() if rc == 0 else None
+    client.connect(mqtt_config.host, mqtt_config.port)
+    client.loop_start()
+    if not connected.wait(10):
+        client.loop_stop()
+        raise ConnectionError(f"Could not connect to MQTT broker {mqtt_config.host}:{mqtt_config.port}")
+    lag = StageTimings()
+    count = 0
+    started = time.perf_counter()
+    try:
+        for _, _, payload in _paced(messages, speed, lag):
+            client.publish(mqtt_config.topic, payload)
+            count += 1
+        elapsed = time.perf_counter() - started
+    finally:
+        client.disconnect()
+        client.loop_stop()
+    return count, elapsed, lag
+
+
+def _parse_speed(raw: str) -> Optional[float]:
+    if raw.lower() in {"max", "0"}:
+        return None
+    return float(raw.rstrip("xX"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic multi-camera Frigate load")
+    parser.add_argument("--cameras", type=int, default=10, help=f"Emulated cameras (1-{MAX_CAMERAS})")
+    parser.add_argument("--camera-names", default="", help="Comma-separated names for the first cameras")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of traffic to generate")
+    parser.add_argument("--objects-per-minute", type=float, default=2.0, help="Poisson arrival rate per camera")
+    parser.add_argument("--dwell", type=float, default=30.0, help="Mean seconds an object stays in view")
+    parser.add_argument("--update-hz", type=float, default=2.0, help="Mean update messages per object per second")
+    parser.add_argument("--burst-probability", type=float, default=0.2, help="Share of objects with an update burst")
+    parser.add_argument("--burst-factor", type=float, default=8.0, help="Update rate multiplier during a burst")
+    parser.add_argument("--burst-seconds", type=float, default=3.0, help="Burst length")
+    parser.add_argument("--stationary", type=float, default=0.1, help="Share of objects that park")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for repeatable runs")
+    parser.add_argument("--speed", default="1", help="1, 10, 10x ... or max")
+    parser.add_argument("--target", choices=("inproc", "mqtt", "capture"), default="inproc")
+    parser.add_argument("--out", type=Path, default=None, help="Capture file for --target capture")
+    parser.add_argument(
+        "--sinks", choices=("null", "config"), default="null", help="inproc: discard decisions or use config sinks"
+    )
+    args = parser.parse_args()
+    if not 1 <= args.cameras <= MAX_CAMERAS:
+        parser.error(f"--cameras must be between 1 and {MAX_CAMERAS}")
+    if args.target == "capture" and args.out is None:
+        parser.error("--target capture needs --out")
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s %(name)s: %(message)s")
+
+    config_path = Path(os.environ.get("SCC_CONFIG", DEFAULT_CONFIG_PATH))
+    app_config = load_app_config(config_path)
+    profile = LoadProfile(
+        cameras=args.cameras,
+        objects_per_minute=args.objects_per_minute,
+        dwell_seconds=args.dwell,
+        update_hz=args.update_hz,
+        burst_probability=args.burst_probability,
+        burst_factor=args.burst_factor,
+        burst_seconds=args.burst_seconds,
+        stationary_probability=args.stationary,
+        camera_names=[name.strip() for name in args.camera_names.split(",") if name.strip()] or None,
+    )
+    speed = _parse_speed(args.speed)
+    generator = FrigateLoadGenerator(profile, seed=args.seed, topic=app_config.mqtt.topic)
+    # Generated up front so payload building is not part of the measurement.
+    messages = list(generator.messages(args.duration))
+    offered = len(messages) / args.duration if args.duration > 0 else 0.0
+
+    if args.target == "capture":
+        writer = CaptureWriter(args.out)
+        for arrival, topic, payload in messages:
+            writer.write(topic, payload, arrival)
+        writer.close()
+        logger.info("Wrote %s messages to %s", len(messages), args.out)
+        return
+
+    if args.target == "mqtt":
+        count, elapsed, lag = run_mqtt(messages, app_config.mqtt, speed)
+        report = LoadReport("mqtt", args.cameras, count, 0, elapsed, offered, lag)
+    else:
+        sinks = build_sinks(app_config.sinks, app_config.mqtt) if args.sinks == "config" else SinkSet([])
+        sinks.start()
+        try:
+            count, decisions, elapsed, lag = run_inproc(messages, app_config, sinks, speed)
+        finally:
+            sinks.close()
+        report = LoadReport("inproc", args.cameras, count, decisions, elapsed, offered, lag, sinks.stats())
+    print(report.format(paced=speed is not None))
+
+
+if __name__ == "__main__":
+    main()
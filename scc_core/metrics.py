@@ -0,0 +1,306 @@
+"""Prometheus-style metrics with low-contention recording.
+
+Every counter and histogram keeps one cell per recording thread (keyed by
+``threading.get_ident()``), so the hot path never takes a lock: a thread only
+ever mutates its own cell, and a scrape sums the cells. Exposition uses the
+Prometheus text format on a small local HTTP server.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_get_ident = threading.get_ident
+
+LabelValues = Tuple[str, ...]
+GaugeSamples = Iterable[Tuple[Dict[str, str], float]]
+
+DEFAULT_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _CounterChild:
+    __slots__ = ("_cells",)
+
+    def __init__(self) -> None:
+        self._cells: Dict[int, List[float]] = {}
+
+    def inc(self, amount: float = 1) -> None:
+        cell = self._cells.get(_get_ident())
+        if cell is None:
+            cell = self._cells.setdefault(_get_ident(), [0])
+        cell[0] += amount
+
+    @property
+    def value(self) -> float:
+        return sum(cell[0] for cell in list(self._cells.values()))
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_cells")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self._bounds = bounds
+        # Per thread: [bucket counts..., +Inf count, sum]
+        self._cells: Dict[int, List[float]] = {}
+
+    def observe(self, value: float) -> None:
+        cell = self._cells.get(_get_ident())
+        if cell is None:
+            cell = self._cells.setdefault(_get_ident(), [0] * (len(self._bounds) + 2))
+        cell[bisect.bisect_left(self._bounds, value)] += 1
+        cell[-1] += value
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """Return (cumulative bucket counts incl. +Inf, count, sum)."""
+
+        totals = [0.0] * (len(self._bounds) + 2)
+        for cell in list(self._cells.values()):
+            for index, value in enumerate(cell):
+                totals[index] += value
+        cumulative = []
+        running = 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, totals[-1]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, values: LabelValues) -> object:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def labels(self, *values: str) -> _CounterChild:
+        return self._child(values)  # type: ignore[return-value]
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def value(self, *values: str) -> float:
+        child = self._children.get(values)
+        return child.value if child is not None else 0.0  # type: ignore[attr-defined]
+
+    def items(self) -> List[Tuple[LabelValues, float]]:
+        return [(values, child.value) for values, child in list(self._children.items())]  # type: ignore[attr-defined]
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"
+            for values, value in self.items()
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def labels(self, *values: str) -> _HistogramChild:
+        return self._child(values)  # type: ignore[return-value]
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def render(self) -> List[str]:
+        lines = []
+        for values, child in list(self._children.items()):
+            cumulative, count, total = child.snapshot()  # type: ignore[attr-defined]
+            for bound, bucket in zip(self.buckets + (float("inf"),), cumulative):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {_format_value(bucket)}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_count{labels} {_format_value(count)}")
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        return lines
+
+
+class GaugeCallback(_Metric):
+    """Gauge whose samples are produced at scrape time by ``fn``."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, fn: Callable[[], GaugeSamples]):
+        super().__init__(name, documentation)
+        self._fn = fn
+
+    def render(self) -> List[str]:
+        lines = []
+        try:
+            samples = list(self._fn())
+        except Exception:  # noqa: BLE001
+            logger.exception("Gauge callback failed", extra={"metric": self.name})
+            return lines
+        for labels, value in samples:
+            names = tuple(labels)
+            lines.append(f"{self.name}{_format_labels(names, [labels[n] for n in names])} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def gauge_callback(self, name: str, documentation: str, fn: Callable[[], GaugeSamples]) -> GaugeCallback:
+        return self.register(GaugeCallback(name, documentation, fn))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class SccMetrics:
+    """The metrics SCC records across the adapter, dedupe and emission stages."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        # Connection-level counters are labelled by site (MQTT connection).
+        self.messages_received = r.counter("scc_mqtt_messages_received_total", "MQTT messages received.", ["site"])
+        self.messages_rejected = r.counter(
+            "scc_mqtt_messages_rejected_total", "Messages rejected by the camera/label prefilter.", ["site"]
+        )
+        self.parse_failures = r.counter(
+            "scc_parse_failures_total", "Payloads that failed UTF-8 or JSON decoding.", ["site"]
+        )
+        self.events_unrecognized = r.counter(
+            "scc_events_unrecognized_total", "Parsed payloads that did not normalize into an event.", ["site"]
+        )
+        self.events_normalized = r.counter("scc_events_normalized_total", "Normalized events.", ["camera"])
+        self.incidents_opened = r.counter("scc_dedupe_incidents_opened_total", "New dedupe incidents.", ["camera"])
+        self.dedupe_hits = r.counter(
+            "scc_dedupe_hits_total", "Events merged into an open dedupe incident.", ["camera"]
+        )
+        self.decisions_emitted = r.counter("scc_decisions_emitted_total", "Decisions emitted.", ["camera"])
+        self.decisions_suppressed = r.counter(
+            "scc_decisions_suppressed_total", "Events that did not produce an emitted decision.", ["camera"]
+        )
+        self.decision_latency = r.histogram(
+            "scc_decision_latency_seconds", "Frigate frame_time to decision emission.", ["camera"]
+        )
+        r.gauge_callback("scc_dedupe_hit_ratio", "Share of events merged into an open incident.", self._hit_ratio)
+
+    def _hit_ratio(self) -> GaugeSamples:
+        opened = dict(self.incidents_opened.items())
+        for values, hits in self.dedupe_hits.items():
+            total = hits + opened.get(values, 0.0)
+            yield {"camera": values[0]}, (hits / total if total else 0.0)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server: "MetricsServer"
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        logger.debug(format, *args)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """Serve ``/metrics`` for a registry from a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464):
+        super().__init__((host, port), _MetricsHandler)
+        self.registry = registry
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.serve_forever, name="scc-metrics", daemon=True)
+        self._thread.start()
+        logger.info("Metrics endpoint listening", extra={"port": self.server_address[1]})
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,112 @@
+"""Opt-in hot-path stage timing with an on-demand dump.
+
+``StageProfiler.record`` writes ``(wall time, stage, seconds)`` into a
+preallocated ring buffer, overwriting the oldest sample once full, so the
+cost per sample is a couple of array stores. Sending the process the dump
+signal (SIGUSR1 by default) writes the buffered samples and a per-stage
+summary table to ``dump_dir`` without stopping the service.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import math
+import signal
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# "enqueue" is the hand-off to the sink buffers; "write" is one sink batch written by its writer thread.
+STAGES: Tuple[str, ...] = ("decode", "json", "normalize", "dedupe", "enqueue", "write")
+
+
+class StageProfiler:
+    def __init__(self, capacity: int = 65_536, stages: Sequence[str] = STAGES):
+        self.capacity = capacity
+        self.stages = tuple(stages)
+        self._stage_index: Dict[str, int] = {name: index for index, name in enumerate(self.stages)}
+        self._wall = array("d", bytes(8 * capacity))
+        self._seconds = array("d", bytes(8 * capacity))
+        self._stage = array("B", bytes(capacity))
+        # next() on itertools.count is atomic under the GIL, so concurrent recorders get distinct slots.
+        self._counter = itertools.count()
+        self._recorded = 0
+
+    def record(self, stage: str, seconds: float) -> None:
+        sequence = next(self._counter)
+        slot = sequence % self.capacity
+        self._wall[slot] = time.time()
+        self._seconds[slot] = seconds
+        self._stage[slot] = self._stage_index[stage]
+        self._recorded = sequence + 1
+
+    def samples(self) -> List[Tuple[float, str, float]]:
+        """Return buffered samples, oldest first."""
+
+        recorded = self._recorded
+        count = min(recorded, self.capacity)
+        start = recorded - count
+        out = []
+        for sequence in range(start, recorded):
+            slot = sequence % self.capacity
+            out.append((self._wall[slot], self.stages[self._stage[slot]], self._seconds[slot]))
+        return out
+
+    def summary(self, samples: Optional[List[Tuple[float, str, float]]] = None) -> str:
+        samples = self.samples() if samples is None else samples
+        by_stage: Dict[str, List[float]] = {name: [] for name in self.stages}
+        for _, stage, seconds in samples:
+            by_stage[stage].append(seconds)
+
+        lines = [f"{'stage':<10} {'count':>8} {'p50 us':>10} {'p90 us':>10} {'p99 us':>10} {'max us':>10} {'total ms':>10}"]
+        for stage, values in by_stage.items():
+            if not values:
+                continue
+            values.sort()
+            lines.append(
+                f"{stage:<10} {len(values):>8} {_pct(values, 50) * 1e6:>10.1f} {_pct(values, 90) * 1e6:>10.1f} "
+                f"{_pct(values, 99) * 1e6:>10.1f} {values[-1] * 1e6:>10.1f} {sum(values) * 1e3:>10.2f}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, directory: Path) -> Path:
+        """Write ``scc-profile-<ts>.tsv`` (samples) and ``.txt`` (summary); return the summary path."""
+
+        samples = self.samples()
+        directory = Path(directory).expanduser()
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        samples_path = directory / f"scc-profile-{stamp}.tsv"
+        summary_path = directory / f"scc-profile-{stamp}.txt"
+        with open(samples_path, "w") as fh:
+            fh.write("wall_time\tstage\tseconds\n")
+            for wall, stage, seconds in samples:
+                fh.write(f"{wall:.6f}\t{stage}\t{seconds:.9f}\n")
+        table = self.summary(samples)
+        summary_path.write_text(table + "\n")
+        logger.info("Wrote profile dump\n%s", table, extra={"path": str(summary_path)})
+        return summary_path
+
+    def install_dump_signal(self, directory: Path, signum: int = signal.SIGUSR1) -> None:
+        """Dump on ``signum``; the write happens on a helper thread, not inside the handler."""
+
+        def _handler(_signum, _frame):
+            threading.Thread(target=self._dump_logged, args=(directory,), name="scc-profile-dump", daemon=True).start()
+
+        signal.signal(signum, _handler)
+
+    def _dump_logged(self, directory: Path) -> None:
+        try:
+            self.dump(directory)
+        except Exception:  # noqa: BLE001
+            logger.exception("Failed to write profile dump")
+
+
+def _pct(sorted_values: List[float], pct: float) -> float:
+    rank = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
@@ -0,0 +1,83 @@
+"""Token-bucket caps on emitted decisions."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+_MISSING: object = object()
+
+
+@dataclass
+class RateLimitConfig:
+    """Decisions per minute allowed per camera (``0`` = unlimited), with bursts up to ``burst``.
+
+    ``cameras`` overrides the per-camera rate; ``global_rate_per_minute`` caps
+    all cameras together.
+    """
+
+    rate_per_minute: float = 0.0
+    burst: float = 3.0
+    cameras: Dict[str, float] = field(default_factory=dict)
+    global_rate_per_minute: float = 0.0
+    global_burst: float = 10.0
+
+
+class _TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate_per_minute: float, capacity: float, now: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now: float) -> bool:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class DecisionRateLimiter:
+    """Per-camera (and optional global) token buckets; callers serialize access."""
+
+    def __init__(self, config: RateLimitConfig):
+        self._config = config
+        self._buckets: Dict[str, Optional[_TokenBucket]] = {}
+        self._global: Optional[_TokenBucket] = None
+
+    def update(self, config: RateLimitConfig) -> None:
+        """Apply new rates; buckets are recreated full on their next use."""
+
+        self._config = config
+        self._buckets = {}
+        self._global = None
+
+    def allow(self, camera_id: str, now: float) -> bool:
+        """Take a token for ``camera_id``; False means the decision should be dropped."""
+
+        bucket = self._buckets.get(camera_id, _MISSING)
+        if bucket is _MISSING:
+            bucket = self._buckets[camera_id] = self._new_bucket(camera_id, now)
+        if bucket is not None and not bucket.take(now):
+            return False
+
+        config = self._config
+        if config.global_rate_per_minute > 0:
+            if self._global is None:
+                self._global = _TokenBucket(config.global_rate_per_minute, config.global_burst, now)
+            if not self._global.take(now):
+                return False
+        return True
+
+    def _new_bucket(self, camera_id: str, now: float) -> Optional[_TokenBucket]:
+        config = self._config
+        rate = config.cameras.get(camera_id, config.rate_per_minute)
+        if rate <= 0:
+            return None
+        return _TokenBucket(rate, config.burst, now)
+
@@ -0,0 +1,103 @@
+"""Hot reload of the runner config file.
+
+``ConfigWatcher`` polls the config file's mtime and size, re-parses it on a
+background thread and hands the old and new :class:`~scc_core.config.AppConfig`
+plus the names of the changed fields to an ``apply`` callback. A file that
+fails to parse is logged and the running settings are kept.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import fields
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from scc_core.config import AppConfig, load_app_config
+
+logger = logging.getLogger(__name__)
+
+# Fields the runner can swap in place; changes to anything else are logged as needing a restart.
+RELOADABLE_FIELDS = frozenset(
+    {
+        "dedupe_window_seconds",
+        "dedupe_windows",
+        "dedupe_adaptive",
+        "suppress_stationary",
+        "min_score_gain",
+        "rate_limit",
+        "cameras",
+        "labels",
+        "mqtt",
+        "sites",
+        "rules",
+    }
+)
+
+
+def changed_fields(old: AppConfig, new: AppConfig) -> List[str]:
+    return [f.name for f in fields(AppConfig) if getattr(old, f.name) != getattr(new, f.name)]
+
+
+class ConfigWatcher:
+    def __init__(
+        self,
+        path: Path,
+        current: AppConfig,
+        apply: Callable[[AppConfig, AppConfig, List[str]], None],
+        poll_seconds: float = 2.0,
+    ):
+        self.path = Path(path)
+        self.current = current
+        self._apply = apply
+        self._poll_seconds = poll_seconds
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="scc-config-watch", daemon=True)
+        self._thread.start()
+        logger.info("Watching config for changes", extra={"path": str(self.path), "poll_seconds": self._poll_seconds})
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def check(self) -> bool:
+        """Reload if the file changed since the last check; return True when settings were applied."""
+
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            new = load_app_config(self.path)
+        except Exception:  # noqa: BLE001
+            logger.exception("Ignoring unreadable config; keeping current settings", extra={"path": str(self.path)})
+            return False
+
+        changed = changed_fields(self.current, new)
+        if not changed:
+            return False
+        try:
+            self._apply(self.current, new, changed)
+        except Exception:  # noqa: BLE001
+            logger.exception("Failed to apply config reload")
+            return False
+        self.current = new
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._poll_seconds):
+            self.check()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
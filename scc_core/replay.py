@@ -0,0 +1,333 @@
+"""Record raw Frigate MQTT payloads and replay them through the SCC ingest path.
+
+Capture files are append-only and length-prefixed so they survive arbitrary
+payload bytes and a truncated tail after a crash::
+
+    b"SCCR1\\n" header, then per message:
+    <f8 arrival epoch><H topic length><I payload length><topic bytes><payload bytes>
+
+Replay drives ``FrigateMqttAdapter._on_message`` directly (no broker), so the
+measured path is the production one: payload decode + ``json.loads``,
+``_normalize_event``, then ``run_scc``'s decision path (lifecycle, correlation,
+dedupe, rules and rate limits). Recording goes through the adapters' MQTT
+transport seam, so it also runs against an ``InMemoryBroker``.
+
+Usage::
+
+    python -m scc_core.replay record --out capture.sccr [--duration 600]
+    python -m scc_core.replay replay capture.sccr [--speed 1|10|max] [--window 15]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import paho.mqtt.client as mqtt
+
+from scc_core.adapters import FrigateMqttAdapter, MqttConfig
+from scc_core.adapters.transport import TransportFactory, paho_transport
+from scc_core.config import load_app_config
+from scc_core.correlation import CameraCorrelator
+from scc_core.dedupe import DedupeAggregator
+from scc_core.events import AnyEvent
+from scc_core.lifecycle import FrigateLifecycleTracker
+from scc_core.ratelimit import DecisionRateLimiter, RateLimitConfig
+from scc_core.rules import RuleEngine
+from scc_core.run_scc import _install_signal_handlers, _on_event_factory
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SCCR1\n"
+_RECORD_HEADER = struct.Struct("<dHI")
+
+DEFAULT_CONFIG_PATH = Path("config/example_frigate.yml")
+
+
+class CaptureWriter:
+    """Append raw MQTT messages with their arrival timestamps to a capture file."""
+
+    def __init__(self, path: Path):
+        self._fh: BinaryIO = open(path, "ab")
+        if self._fh.tell() == 0:
+            self._fh.write(MAGIC)
+        self._lock = threading.Lock()
+
+    def write(self, topic: str, payload: bytes, arrival: Optional[float] = None) -> None:
+        topic_bytes = topic.encode("utf-8")
+        header = _RECORD_HEADER.pack(time.time() if arrival is None else arrival, len(topic_bytes), len(payload))
+        with self._lock:
+            self._fh.write(header + topic_bytes + payload)
+
+    def close(self) -> None:
+        with self._lock:
+            self._fh.close()
+
+
+def read_capture(path: Path) -> Iterator[Tuple[float, str, bytes]]:
+    """Yield ``(arrival, topic, payload)`` records; a truncated trailing record is ignored."""
+
+    with open(path, "rb") as fh:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an SCC capture file")
+        while True:
+            header = fh.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            arrival, topic_len, payload_len = _RECORD_HEADER.unpack(header)
+            body = fh.read(topic_len + payload_len)
+            if len(body) < topic_len + payload_len:
+                logger.warning("Capture ends with a truncated record", extra={"path": str(path)})
+                return
+            yield arrival, body[:topic_len].decode("utf-8"), body[topic_len:]
+
+
+def record(
+    mqtt_config: MqttConfig,
+    out: Path,
+    stop_event: threading.Event,
+    transport: TransportFactory = paho_transport,
+) -> int:
+    """Subscribe to the configured topic and append every message to ``out``."""
+
+    writer = CaptureWriter(out)
+    count = 0
+
+    def _on_connect(client, userdata, flags, rc):
+        if rc == 0:
+            client.subscribe(mqtt_config.topic)
+        else:
+            logger.error("MQTT connection failed", extra={"code": rc})
+
+    def _on_message(client, userdata, msg):
+        nonlocal count
+        writer.write(msg.topic, msg.payload)
+        count += 1
+
+    client = transport(replace(mqtt_config, client_id=f"{mqtt_config.client_id or 'scc'}-recorder"))
+    client.on_connect = _on_connect
+    client.on_message = _on_message
+    client.connect(mqtt_config.host, mqtt_config.port)
+    client.loop_start()
+    try:
+        while not stop_event.is_set():
+            stop_event.wait(0.5)
+    finally:
+        client.disconnect()
+        client.loop_stop()
+        writer.close()
+    return count
+
+
+@dataclass
+class StageTimings:
+    """Per-stage latency samples in seconds."""
+
+    samples: Dict[str, List[float]] = field(default_factory=dict)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def percentile(self, stage: str, pct: float) -> float:
+        values = sorted(self.samples.get(stage, ()))
+        if not values:
+            return 0.0
+        rank = min(len(values) - 1, max(0, math.ceil(pct / 100.0 * len(values)) - 1))
+        return values[rank]
+
+
+@dataclass
+class ReplayReport:
+    messages: int
+    events: int
+    decisions: int
+    elapsed: float
+    timings: StageTimings
+
+    @property
+    def events_per_second(self) -> float:
+        return self.messages / self.elapsed if self.elapsed else float("inf")
+
+    def format(self) -> str:
+        lines = [
+            f"messages:   {self.messages}",
+            f"events:     {self.events}",
+            f"decisions:  {self.decisions}",
+            f"elapsed:    {self.elapsed:.3f}s",
+            f"throughput: {self.events_per_second:,.0f} msg/s",
+            "",
+            f"{'stage':<12} {'p50 us':>10} {'p99 us':>10}",
+        ]
+        for stage in ("parse", "normalize", "decide", "total"):
+            lines.append(
+                f"{stage:<12} {self.timings.percentile(stage, 50) * 1e6:>10.1f} "
+                f"{self.timings.percentile(stage, 99) * 1e6:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+def replay(
+    records: Iterator[Tuple[float, str, bytes]],
+    aggregator: DedupeAggregator,
+    lifecycle: Optional[FrigateLifecycleTracker] = None,
+    speed: Optional[float] = None,
+    compact_events: bool = False,
+    rules: Optional[RuleEngine] = None,
+    limiter: Optional[DecisionRateLimiter] = None,
+    correlator: Optional[CameraCorrelator] = None,
+) -> ReplayReport:
+    """Push recorded messages through the adapter and ``run_scc``'s decision path without a broker.
+
+    ``speed`` of ``None`` replays as fast as possible; otherwise inter-arrival
+    gaps are divided by ``speed`` (1.0 reproduces the original pacing). Rate
+    limits run on the wall clock as they do live, so only a paced replay drops
+    the same decisions.
+    """
+
+    adapter = FrigateMqttAdapter(mqtt_config=MqttConfig(host="replay"), compact_events=compact_events)
+    timings = StageTimings()
+    perf = time.perf_counter
+    counters = {"events": 0, "decisions": 0}
+    stage_spent = [0.0]
+
+    normalize = adapter._normalize_event
+
+    def _timed_normalize(payload):
+        started = perf()
+        event = normalize(payload)
+        spent = perf() - started
+        timings.add("normalize", spent)
+        stage_spent[0] += spent
+        return event
+
+    def _count_decision(line: bytes) -> None:
+        counters["decisions"] += 1
+
+    decide = _on_event_factory(
+        aggregator,
+        lifecycle,
+        threading.Lock(),
+        emit=_count_decision,
+        rules=rules,
+        limiter=limiter,
+        correlator=correlator,
+    )
+
+    def _on_event(event: AnyEvent) -> None:
+        started = perf()
+        decide(event)
+        spent = perf() - started
+        timings.add("decide", spent)
+        stage_spent[0] += spent
+        counters["events"] += 1
+
+    adapter._normalize_event = _timed_normalize  # type: ignore[method-assign]
+    adapter._on_event = _on_event
+
+    messages = 0
+    first_arrival: Optional[float] = None
+    wall_start = perf()
+    busy = 0.0
+    for arrival, topic, payload in records:
+        if speed is not None:
+            if first_arrival is None:
+                first_arrival = arrival
+            delay = (arrival - first_arrival) / speed - (perf() - wall_start)
+            if delay > 0:
+                time.sleep(delay)
+
+        msg = mqtt.MQTTMessage(topic=topic.encode("utf-8"))
+        msg.payload = payload
+        stage_spent[0] = 0.0
+        started = perf()
+        adapter._on_message(None, None, msg)
+        total = perf() - started
+        busy += total
+        timings.add("total", total)
+        timings.add("parse", max(0.0, total - stage_spent[0]))
+        messages += 1
+
+    # Paced replays report throughput over processing time, not wall time spent sleeping.
+    elapsed = busy if speed is not None else perf() - wall_start
+    return ReplayReport(
+        messages=messages,
+        events=counters["events"],
+        decisions=counters["decisions"],
+        elapsed=elapsed,
+        timings=timings,
+    )
+
+
+def _parse_speed(raw: str) -> Optional[float]:
+    if raw.lower() in {"max", "0"}:
+        return None
+    return float(raw.rstrip("xX"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record and replay Frigate MQTT traffic")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Append raw broker messages to a capture file")
+    rec.add_argument("--out", type=Path, required=True, help="Capture file (appended to)")
+    rec.add_argument("--duration", type=float, default=None, help="Stop after N seconds")
+
+    rep = sub.add_parser("replay", help="Replay a capture through the ingest path")
+    rep.add_argument("capture", type=Path)
+    rep.add_argument("--speed", default="max", help="1, 10, 10x ... or max (default)")
+    rep.add_argument("--window", type=int, default=None, help="Dedupe window (defaults to config)")
+    rep.add_argument("--no-lifecycle", action="store_true", help="Disable Frigate lifecycle tracking")
+    rep.add_argument("--compact", action="store_true", help="Normalize into CompactEvent instead of Event")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s %(name)s: %(message)s")
+
+    config_path = Path(os.environ.get("SCC_CONFIG", DEFAULT_CONFIG_PATH))
+    app_config = load_app_config(config_path)
+
+    if args.command == "record":
+        stop_event = threading.Event()
+        if args.duration:
+            timer = threading.Timer(args.duration, stop_event.set)
+            timer.daemon = True
+            timer.start()
+        _install_signal_handlers(stop_event)
+        count = record(app_config.mqtt, args.out, stop_event)
+        logger.info("Recorded %s messages to %s", count, args.out)
+        return
+
+    window = args.window if args.window is not None else app_config.dedupe_window_seconds
+    lifecycle = None
+    if not args.no_lifecycle and app_config.lifecycle_tracking:
+        lifecycle = FrigateLifecycleTracker(
+            min_score_gain=app_config.min_score_gain, suppress_stationary=app_config.suppress_stationary
+        )
+    aggregator = DedupeAggregator(
+        window_seconds=window,
+        windows=app_config.dedupe_windows,
+        adaptive=app_config.dedupe_adaptive,
+        zone_keys=app_config.dedupe_zone_keys,
+    )
+    report = replay(
+        read_capture(args.capture),
+        aggregator,
+        lifecycle=lifecycle,
+        speed=_parse_speed(args.speed),
+        compact_events=args.compact or app_config.compact_events,
+        rules=RuleEngine(app_config.rules),
+        limiter=DecisionRateLimiter(app_config.rate_limit or RateLimitConfig()),
+        correlator=CameraCorrelator(app_config.correlation) if app_config.correlation is not None else None,
+    )
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""Compiled business rules applied to decisions after dedupe.
+
+Rules are compiled once (at start and on config reload) into:
+
+* one minute-of-week bitmap per schedule (``bytearray(10080)``, Monday 00:00 = 0), and
+* a dispatch table keyed by ``(camera_id, event_type)`` with ``"*"`` wildcards.
+
+``RuleEngine.evaluate`` is then a dict lookup plus one bitmap index; the local
+minute of week comes from the epoch and a UTC offset cached per quarter hour, so no
+datetime arithmetic happens per decision. The result is an :class:`ActionSet`
+such as ``notify``, ``notify + announce`` or ``suppress``.
+
+Example (``rules`` section of the runner config)::
+
+    rules:
+      timezone: "America/Chicago"   # optional; defaults to the host's local time
+      manual_announce: false        # announce outside the schedule too
+      default: [notify]
+      schedules:
+        business_hours:
+          - days: [thu, fri, sat]
+            start: "10:00"
+            end: "16:30"
+      rules:
+        - cameras: [front_gate, signpost]
+          event_types: [person_detected]
+          schedule: business_hours
+          actions: [notify, announce]
+          otherwise: [notify]
+          announcement: gate        # tells consumers which announcement to play
+        - cameras: [facetag]
+          actions: [notify, announce]
+          announcement: greeting
+          cooldown_seconds: 300     # announce at most once per 5 minutes per camera
+
+The most specific match wins (camera and event type, then camera, then event
+type, then neither); among equally specific rules the first one listed wins.
+A rule's ``cooldown_seconds`` drops ``announce`` from its decisions for the same
+camera and event type until that long after the last announced one. ``announce``
+is only ever left on the first decision for a Frigate object (its ``event_id``);
+the later decisions for its updates and ``end`` go out without it. A rule's
+``announcement`` name is added to the decision line next to ``announce``.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+ACTIONS = ("notify", "announce", "suppress")
+MINUTES_PER_WEEK = 7 * 24 * 60
+WILDCARD = "*"
+
+_DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+# 1970-01-01 (epoch minute 0) was a Thursday.
+_EPOCH_MINUTE_OF_WEEK = 3 * 24 * 60
+# Objects remembered for announce-once; far more than are ever in view at once.
+_MAX_DECIDED_OBJECTS = 4096
+
+
+@dataclass
+class RulesConfig:
+    rules: List[Dict[str, Any]] = field(default_factory=list)
+    schedules: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    default: Tuple[str, ...] = ("notify",)
+    manual_announce: bool = False
+    timezone: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ActionSet:
+    actions: Tuple[str, ...]
+    # Replaces the closing brace of a decision's summary JSON to add the actions.
+    json_suffix: bytes
+    announcement: Optional[str] = None
+
+    @property
+    def suppress(self) -> bool:
+        return "suppress" in self.actions
+
+    def annotate(self, summary_json: bytes) -> bytes:
+        return summary_json[:-1] + self.json_suffix
+
+
+@dataclass(frozen=True)
+class _CompiledRule:
+    bitmap: Optional[bytearray]
+    in_schedule: ActionSet
+    out_of_schedule: ActionSet
+    out_of_schedule_manual: ActionSet
+    cooldown: float = 0.0
+
+
+@dataclass
+class _CompiledRules:
+    table: Dict[Tuple[str, str], _CompiledRule]
+    default: _CompiledRule
+    manual_announce: bool
+    tz: Any
+    # Lookups already resolved through the wildcard fallbacks.
+    resolved: Dict[Tuple[str, str], _CompiledRule] = field(default_factory=dict)
+    # (valid_from, valid_until, utc_offset_seconds) for the local-time conversion.
+    offset: Tuple[float, float, int] = (0.0, -1.0, 0)
+
+
+def _action_set(actions: Iterable[str], announcement: Optional[str] = None) -> ActionSet:
+    names = []
+    for name in actions:
+        name = str(name).strip().lower()
+        if name not in ACTIONS:
+            raise ValueError(f"Unknown rule action {name!r}; expected one of {', '.join(ACTIONS)}")
+        if name not in names:
+            names.append(name)
+    if "suppress" in names:
+        names = ["suppress"]
+    ordered = tuple(sorted(names, key=ACTIONS.index))
+    suffix = b', "actions": ' + json.dumps(list(ordered)).encode("utf-8")
+    if announcement is None or "announce" not in ordered:
+        announcement = None
+    else:
+        suffix += b', "announcement": ' + json.dumps(announcement).encode("utf-8")
+    return ActionSet(actions=ordered, json_suffix=suffix + b"}", announcement=announcement)
+
+
+def _names(value: Any) -> List[str]:
+    if value is None or value == WILDCARD:
+        return [WILDCARD]
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(",") if part.strip()]
+    return [str(part) for part in value]
+
+
+def _days(value: Any) -> List[int]:
+    days: List[int] = []
+    for part in _names(value):
+        if part == WILDCARD:
+            return list(range(7))
+        part = part.lower()
+        if "-" in part:
+            first, last = (_DAY_NAMES.index(name[:3]) for name in part.split("-", 1))
+            span = (last - first) % 7
+            days.extend((first + offset) % 7 for offset in range(span + 1))
+        else:
+            days.append(_DAY_NAMES.index(part[:3]))
+    return days
+
+
+def _minute_of_day(value: Any) -> int:
+    hours, _, minutes = str(value).partition(":")
+    minute = int(hours) * 60 + int(minutes or 0)
+    if not 0 <= minute <= 24 * 60:
+        raise ValueError(f"Invalid time of day {value!r}")
+    return minute
+
+
+def compile_schedule(windows: Sequence[Dict[str, Any]]) -> bytearray:
+    """Return a minute-of-week bitmap with 1 for every minute inside ``windows``.
+
+    A window whose ``end`` is not after its ``start`` runs past midnight.
+    """
+
+    bitmap = bytearray(MINUTES_PER_WEEK)
+    for window in windows:
+        start = _minute_of_day(window.get("start", "00:00"))
+        end = _minute_of_day(window.get("end", "24:00"))
+        length = end - start if end > start else end + 24 * 60 - start
+        for day in _days(window.get("days")):
+            first = day * 24 * 60 + start
+            stop = first + length
+            if stop <= MINUTES_PER_WEEK:
+                bitmap[first:stop] = b"\x01" * length
+            else:
+                # Sunday night into Monday morning.
+                bitmap[first:] = b"\x01" * (MINUTES_PER_WEEK - first)
+                bitmap[: stop - MINUTES_PER_WEEK] = b"\x01" * (stop - MINUTES_PER_WEEK)
+    return bitmap
+
+
+def _compile_rule(rule: Dict[str, Any], schedules: Dict[str, bytearray]) -> _CompiledRule:
+    announcement = rule.get("announcement")
+    announcement = str(announcement) if announcement is not None else None
+    in_schedule = _action_set(_names(rule.get("actions", "notify")), announcement)
+    cooldown = float(rule.get("cooldown_seconds", 0) or 0)
+    schedule_name = rule.get("schedule")
+    if schedule_name is None:
+        return _CompiledRule(None, in_schedule, in_schedule, in_schedule, cooldown)
+    if schedule_name not in schedules:
+        raise ValueError(f"Rule refers to unknown schedule {schedule_name!r}")
+    out_of_schedule = _action_set(_names(rule.get("otherwise", "notify")), announcement)
+    manual = out_of_schedule
+    if "announce" in in_schedule.actions and not out_of_schedule.suppress:
+        manual = _action_set(out_of_schedule.actions + ("announce",), announcement)
+    return _CompiledRule(schedules[schedule_name], in_schedule, out_of_schedule, manual, cooldown)
+
+
+def compile_rules(config: RulesConfig) -> _CompiledRules:
+    """Compile ``config``; raises ``ValueError`` on unknown actions, days, schedules or time zones."""
+
+    schedules = {name: compile_schedule(windows or []) for name, windows in config.schedules.items()}
+    table: Dict[Tuple[str, str], _CompiledRule] = {}
+    for rule in config.rules:
+        compiled = _compile_rule(rule, schedules)
+        for camera in _names(rule.get("cameras")):
+            for event_type in _names(rule.get("event_types")):
+                table.setdefault((camera, event_type), compiled)
+    default = _action_set(config.default)
+    tz = None
+    if config.timezone:
+        from zoneinfo import ZoneInfo
+
+        tz = ZoneInfo(config.timezone)
+    return _CompiledRules(
+        table=table,
+        default=_CompiledRule(None, default, default, default),
+        manual_announce=config.manual_announce,
+        tz=tz,
+    )
+
+
+class RuleEngine:
+    """Evaluate compiled rules; :meth:`update` swaps in a new rule set atomically.
+
+    Cooldowns are tracked per ``(camera_id, event_type)``; callers evaluate a
+    given key from one thread at a time (the event queue shards by that key).
+    Objects are remembered per ``(camera_id, event_id)`` so only their first
+    decision can announce.
+    """
+
+    def __init__(self, config: Optional[RulesConfig] = None):
+        self._compiled = compile_rules(config or RulesConfig())
+        self.manual_announce = self._compiled.manual_announce
+        # (camera_id, event_type) -> epoch of the last decision left with ``announce``; kept across updates.
+        self._announced: Dict[Tuple[str, str], float] = {}
+        self._quiet: Dict[ActionSet, ActionSet] = {}
+        # Frigate objects that already had a decision, oldest first.
+        self._decided: "OrderedDict[Tuple[str, Any], None]" = OrderedDict()
+
+    def update(self, config: RulesConfig) -> None:
+        """Compile ``config`` and replace the active rules; raises ``ValueError`` and keeps them if invalid."""
+
+        compiled = compile_rules(config)
+        self._compiled = compiled
+        self.manual_announce = compiled.manual_announce
+
+    def evaluate(self, camera_id: str, event_type: str, epoch: float, event_id: Any = None) -> ActionSet:
+        compiled = self._compiled
+        key = (camera_id, event_type)
+        rule = compiled.resolved.get(key)
+        if rule is None:
+            rule = _resolve(compiled, key)
+        if rule.bitmap is None or rule.bitmap[_minute_of_week(compiled, epoch)]:
+            actions = rule.in_schedule
+        else:
+            actions = rule.out_of_schedule_manual if self.manual_announce else rule.out_of_schedule
+        if event_id is not None:
+            obj = (camera_id, event_id)
+            if obj in self._decided:
+                return self._without_announce(actions) if "announce" in actions.actions else actions
+            self._decided[obj] = None
+            if len(self._decided) > _MAX_DECIDED_OBJECTS:
+                self._decided.popitem(last=False)
+        if rule.cooldown and "announce" in actions.actions:
+            last = self._announced.get(key)
+            if last is not None and epoch - last < rule.cooldown:
+                return self._without_announce(actions)
+            self._announced[key] = epoch
+        return actions
+
+    def _without_announce(self, actions: ActionSet) -> ActionSet:
+        quiet = self._quiet.get(actions)
+        if quiet is None:
+            quiet = self._quiet[actions] = _action_set(name for name in actions.actions if name != "announce")
+        return quiet
+
+    def minute_of_week(self, epoch: float) -> int:
+        """Local minute of the week (Monday 00:00 = 0) for a UTC epoch."""
+
+        return _minute_of_week(self._compiled, epoch)
+
+
+def _resolve(compiled: _CompiledRules, key: Tuple[str, str]) -> _CompiledRule:
+    camera_id, event_type = key
+    table = compiled.table
+    rule = (
+        table.get(key)
+        or table.get((camera_id, WILDCARD))
+        or table.get((WILDCARD, event_type))
+        or table.get((WILDCARD, WILDCARD))
+        or compiled.default
+    )
+    compiled.resolved[key] = rule
+    return rule
+
+
+def _minute_of_week(compiled: _CompiledRules, epoch: float) -> int:
+    valid_from, valid_until, offset = compiled.offset
+    if not valid_from <= epoch < valid_until:
+        if compiled.tz is not None:
+            delta = datetime.fromtimestamp(epoch, compiled.tz).utcoffset()
+            offset = int(delta.total_seconds()) if delta is not None else 0
+        else:
+            offset = time.localtime(epoch).tm_gmtoff
+        # UTC offsets change on quarter-hour boundaries at the finest, so one lookup covers the quarter.
+        quarter_start = epoch - (epoch % 900)
+        compiled.offset = (quarter_start, quarter_start + 900, offset)
+    return (int((epoch + offset) // 60) + _EPOCH_MINUTE_OF_WEEK) % MINUTES_PER_WEEK
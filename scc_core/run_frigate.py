@@ -8,6 +8,7 @@ from pathlib import Path
 from scc_core.adapters import FrigateMqttAdapter
 from scc_core.config import load_app_config
 from scc_core.dedupe import DedupeAggregator
+from scc_core.lifecycle import FrigateLifecycleTracker
 
 logger = logging.getLogger(__name__)
 
@@ -26,13 +27,28 @@ def main() -> None:
 
     config = load_app_config(args.config)
     aggregator = DedupeAggregator(window_seconds=config.dedupe_window_seconds)
-    adapter = FrigateMqttAdapter(mqtt_config=config.mqtt)
+    lifecycle = (
+        FrigateLifecycleTracker(min_score_gain=config.min_score_gain, suppress_stationary=config.suppress_stationary)
+        if config.lifecycle_tracking
+        else None
+    )
+    adapter = FrigateMqttAdapter(
+        mqtt_config=config.mqtt,
+        queue_config=config.queue,
+        compact_events=config.compact_events,
+        cameras=config.cameras,
+        labels=config.labels,
+    )
 
     stop_event = threading.Event()
 
+    lock = threading.Lock()
+
     def _on_event(event):
-        decision = aggregator.process(event)
-        if decision:
+        with lock:
+            material = lifecycle.observe(event) if lifecycle else True
+            decision = aggregator.process(event) if material else None
+        if decision and material:
             logger.info("Decision emitted", extra=decision.summary())
 
     adapter.start(on_event=_on_event, stop_event=stop_event)
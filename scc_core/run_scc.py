@@ -1,16 +1,33 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 import os
 import signal
+import sys
 import threading
+import time
 from pathlib import Path
+from typing import Callable, Dict, List, Optional
 
-from scc_core.adapters import FrigateMqttAdapter
+from scc_core.adapters import AsyncFrigateMqttAdapter, FrigateMqttAdapter, run_adapters
+from scc_core.backfill import BackfillConfig, LiveGate, run_backfill
 from scc_core.config import AppConfig, load_app_config
+from scc_core.correlation import CameraCorrelator
+from scc_core.decision_api import DecisionQueryServer, DecisionRing
 from scc_core.dedupe import DedupeAggregator
-from scc_core.events import Event
+from scc_core.events import AnyEvent, event_epoch
+from scc_core.journal import EventJournal
+from scc_core.lifecycle import FrigateLifecycleTracker
+from scc_core.metrics import MetricsServer, SccMetrics
+from scc_core.profiling import StageProfiler
+from scc_core.ratelimit import DecisionRateLimiter, RateLimitConfig
+from scc_core.reload import RELOADABLE_FIELDS, ConfigWatcher
+from scc_core.rules import RuleEngine
+from scc_core.sharded import run_sharded
+from scc_core.sinks import SinkSet, build_sinks
+from scc_core.snapshots import SnapshotFetcher
+from scc_core.state import StateSnapshotter
 
 DEFAULT_CONFIG_PATH = Path("config/example_frigate.yml")
 
@@ -24,32 +41,385 @@ def _install_signal_handlers(stop_event: threading.Event) -> None:
     signal.signal(signal.SIGTERM, _handler)
 
 
+def _config_path() -> Path:
+    return Path(os.environ.get("SCC_CONFIG", DEFAULT_CONFIG_PATH))
+
+
 def _build_app_config() -> AppConfig:
-    config_path = Path(os.environ.get("SCC_CONFIG", DEFAULT_CONFIG_PATH))
+    config_path = _config_path()
     logging.info("Loading config", extra={"path": str(config_path)})
     return load_app_config(config_path)
 
 
-def _on_event_factory(aggregator: DedupeAggregator):
-    def _on_event(event: Event) -> None:
-        decision = aggregator.process(event)
-        if decision:
-            print(json.dumps(decision.summary()), flush=True)
+def _write_decision(line: bytes) -> None:
+    sys.stdout.buffer.write(line + b"\n")
+    sys.stdout.buffer.flush()
+
+
+def _on_event_factory(
+    aggregator: DedupeAggregator,
+    lifecycle: Optional[FrigateLifecycleTracker] = None,
+    lock: Optional[threading.Lock] = None,
+    emit: Callable[[bytes], None] = _write_decision,
+    journal: Optional[EventJournal] = None,
+    ring: Optional[DecisionRing] = None,
+    metrics: Optional[SccMetrics] = None,
+    profiler: Optional[StageProfiler] = None,
+    rules: Optional[RuleEngine] = None,
+    limiter: Optional[DecisionRateLimiter] = None,
+    correlator: Optional[CameraCorrelator] = None,
+    snapshots: Optional[SnapshotFetcher] = None,
+):
+    # Queue workers may call in concurrently; only the stateful stages are serialized.
+    lock = lock or threading.Lock()
+
+    def _on_event(event: AnyEvent) -> None:
+        started = time.perf_counter() if profiler is not None else 0.0
+        with lock:
+            material = lifecycle.observe(event) if lifecycle else True
+            if correlator is not None and correlator.observe(event):
+                # Same object arriving from a neighboring camera; already reported there.
+                material = False
+            # Stationary and repeated updates skip dedupe, so they cannot keep an incident open.
+            decision = aggregator.process(event) if material else None
+        if profiler is not None:
+            profiler.record("dedupe", time.perf_counter() - started)
+        if journal is not None:
+            journal.append_event(event)
+        actions = None
+        if decision and material and rules is not None:
+            actions = rules.evaluate(
+                decision.camera_id, decision.event_type, event_epoch(decision), decision.meta.get("event_id")
+            )
+            if actions.suppress:
+                material = False
+        if decision and material and limiter is not None:
+            with lock:
+                material = limiter.allow(decision.camera_id, time.time())
+        if decision and material:
+            action_names = actions.actions if actions is not None else ()
+            seq = ring.add(decision, action_names) if ring is not None else None
+            if journal is not None:
+                journal.append_decision(decision, action_names, seq)
+            line = actions.annotate(decision.summary_json()) if actions is not None else decision.summary_json()
+            if profiler is not None:
+                started = time.perf_counter()
+                emit(line)
+                profiler.record("enqueue", time.perf_counter() - started)
+            else:
+                emit(line)
+            if snapshots is not None:
+                snapshots.submit(decision)
+            if metrics is not None:
+                metrics.decisions_emitted.labels(event.camera_id).inc()
+                metrics.decision_latency.labels(event.camera_id).observe(time.time() - event_epoch(event))
+        elif metrics is not None:
+            metrics.decisions_suppressed.labels(event.camera_id).inc()
 
     return _on_event
 
 
+def _seed_factory(
+    aggregator: DedupeAggregator,
+    lifecycle: Optional[FrigateLifecycleTracker],
+    lock: threading.Lock,
+    correlator: Optional[CameraCorrelator] = None,
+) -> Callable[[AnyEvent], None]:
+    """Update lifecycle, correlation and dedupe state from a historical event without emitting."""
+
+    def _seed(event: AnyEvent) -> None:
+        with lock:
+            material = lifecycle.observe(event) if lifecycle is not None else True
+            if correlator is not None and correlator.observe(event):
+                material = False
+            if material:
+                aggregator.process(event)
+
+    return _seed
+
+
+def _start_backfill(
+    config: BackfillConfig,
+    adapters: Dict[str, FrigateMqttAdapter],
+    seed: Callable[[AnyEvent], None],
+    gate: LiveGate,
+) -> threading.Thread:
+    def _run() -> None:
+        # Read history only once live MQTT is subscribed, so nothing falls between the two.
+        deadline = time.monotonic() + config.timeout
+        while not all(adapter.connected for adapter in adapters.values()) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        fetched = seeded = 0
+        try:
+            fetched, seeded = run_backfill(
+                config, {site: adapter.normalize_payload for site, adapter in adapters.items()}, seed, gate=gate
+            )
+        finally:
+            held = gate.open()
+        logging.info("Backfill complete; switching to live", extra={"fetched": fetched, "seeded": seeded, "held": held})
+
+    thread = threading.Thread(target=_run, name="scc-backfill", daemon=True)
+    thread.start()
+    return thread
+
+
+def _config_reloader(
+    aggregator: DedupeAggregator,
+    lifecycle: Optional[FrigateLifecycleTracker],
+    lock: threading.Lock,
+    adapters: Dict[str, FrigateMqttAdapter],
+    rules: RuleEngine,
+    limiter: DecisionRateLimiter,
+) -> Callable[[AppConfig, AppConfig, List[str]], None]:
+    def _apply(old: AppConfig, new: AppConfig, changed: List[str]) -> None:
+        if "rules" in changed:
+            # First, so an invalid rule set rejects the whole reload.
+            rules.update(new.rules)
+        if {"dedupe_window_seconds", "dedupe_windows", "dedupe_adaptive"}.intersection(changed):
+            with lock:
+                aggregator.set_window(new.dedupe_window_seconds, new.dedupe_windows, new.dedupe_adaptive)
+        if "suppress_stationary" in changed and lifecycle is not None:
+            lifecycle.suppress_stationary = new.suppress_stationary
+        if "min_score_gain" in changed and lifecycle is not None:
+            lifecycle.min_score_gain = new.min_score_gain
+        if "rate_limit" in changed:
+            with lock:
+                limiter.update(new.rate_limit or RateLimitConfig())
+        if "cameras" in changed or "labels" in changed:
+            for adapter in adapters.values():
+                adapter.set_filters(new.cameras, new.labels)
+        pending = [name for name in changed if name not in RELOADABLE_FIELDS]
+        if "mqtt" in changed and not old.sites and not new.sites:
+            adapters[new.mqtt.site].reconfigure_mqtt(new.mqtt)
+        if "sites" in changed or "mqtt" in changed:
+            if set(old.sites) != set(new.sites):
+                # Adding or removing connections needs a restart; changed ones reconnect in place.
+                pending.append("sites")
+            for name, mqtt_config in new.sites.items():
+                if name in adapters and old.sites.get(name) != mqtt_config:
+                    adapters[name].reconfigure_mqtt(mqtt_config)
+        logging.info("Reloaded config", extra={"fields": [name for name in changed if name in RELOADABLE_FIELDS]})
+        if pending:
+            logging.warning("Config changes need a restart to take effect", extra={"fields": pending})
+
+    return _apply
+
+
+async def _run_async(adapters: List[AsyncFrigateMqttAdapter], on_event: Callable[[AnyEvent], None]) -> None:
+    """Consume events on one asyncio loop; SIGINT/SIGTERM stop the adapters and drain their buffers."""
+
+    for adapter in adapters:
+        await adapter.start()
+
+    loop = asyncio.get_running_loop()
+
+    def _stop() -> None:
+        for adapter in adapters:
+            loop.create_task(adapter.stop())
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, _stop)
+
+    async def _consume(adapter: AsyncFrigateMqttAdapter) -> None:
+        async for event in adapter.events():
+            try:
+                on_event(event)
+            except Exception:  # noqa: BLE001
+                logging.exception("Failed to handle Frigate event")
+
+    await asyncio.gather(*(_consume(adapter) for adapter in adapters))
+
+
 def main() -> None:
     logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s %(name)s: %(message)s")
 
     app_config = _build_app_config()
-    aggregator = DedupeAggregator(window_seconds=app_config.dedupe_window_seconds)
-    adapter = FrigateMqttAdapter(mqtt_config=app_config.mqtt)
-
     stop_event = threading.Event()
     _install_signal_handlers(stop_event)
 
-    adapter.start(on_event=_on_event_factory(aggregator), stop_event=stop_event)
+    profiler = None
+    if app_config.profiling:
+        profiler = StageProfiler(capacity=app_config.profiling_samples)
+        profiler.install_dump_signal(app_config.profiling_dump_dir)
+        logging.info(
+            "Stage profiling enabled; send SIGUSR1 to dump",
+            extra={"pid": os.getpid(), "dump_dir": str(app_config.profiling_dump_dir)},
+        )
+
+    sinks = build_sinks(
+        app_config.sinks, app_config.mqtt, profiler=profiler if app_config.shard_workers <= 1 else None
+    )
+    sinks.start()
+
+    metrics = None
+    metrics_server = None
+    if app_config.metrics_port is not None:
+        metrics = SccMetrics()
+        metrics.registry.gauge_callback(
+            "scc_sink_backlog", "Lines buffered per sink.", lambda: _sink_samples(sinks, "backlog")
+        )
+        metrics.registry.gauge_callback(
+            "scc_sink_dropped", "Lines dropped per sink.", lambda: _sink_samples(sinks, "dropped")
+        )
+        metrics.registry.gauge_callback(
+            "scc_sink_latency_seconds_max", "Worst enqueue-to-write latency per sink.",
+            lambda: _sink_samples(sinks, "latency_seconds_max"),
+        )
+        metrics_server = MetricsServer(metrics.registry, host=app_config.metrics_host, port=app_config.metrics_port)
+        metrics_server.start()
+
+    try:
+        _run_pipeline(app_config, sinks, stop_event, metrics, profiler, config_path=_config_path())
+    finally:
+        sinks.close()
+        if metrics_server is not None:
+            metrics_server.stop()
+
+
+def _sink_samples(sinks: SinkSet, key: str):
+    return [({"sink": stats["sink"]}, stats[key]) for stats in sinks.stats()]
+
+
+def _run_pipeline(
+    app_config: AppConfig,
+    sinks: SinkSet,
+    stop_event: threading.Event,
+    metrics: Optional[SccMetrics] = None,
+    profiler: Optional[StageProfiler] = None,
+    config_path: Optional[Path] = None,
+) -> None:
+    if app_config.shard_workers > 1:
+        # Each shard process keeps its own in-memory state; the queue, state snapshots, journal,
+        # query API, stage profiler, config reload, snapshots and backfill apply to single-process mode.
+        run_sharded(app_config, app_config.shard_workers, sinks.emit, stop_event, metrics=metrics)
+        return
+
+    aggregator = DedupeAggregator(
+        window_seconds=app_config.dedupe_window_seconds,
+        metrics=metrics,
+        windows=app_config.dedupe_windows,
+        adaptive=app_config.dedupe_adaptive,
+        zone_keys=app_config.dedupe_zone_keys,
+    )
+    lifecycle = (
+        FrigateLifecycleTracker(
+            min_score_gain=app_config.min_score_gain, suppress_stationary=app_config.suppress_stationary
+        )
+        if app_config.lifecycle_tracking
+        else None
+    )
+    state_lock = threading.Lock()
+    snapshotter = None
+    if app_config.state_path is not None:
+        snapshotter = StateSnapshotter(
+            app_config.state_path,
+            aggregator,
+            lifecycle,
+            interval_seconds=app_config.state_snapshot_seconds,
+            lock=state_lock,
+            compact_events=app_config.compact_events,
+        )
+        snapshotter.restore()
+        snapshotter.start()
+
+    journal = EventJournal.from_config(app_config.journal) if app_config.journal is not None else None
+    snapshots = None
+    if app_config.snapshots is not None:
+        snapshots = SnapshotFetcher(app_config.snapshots)
+        snapshots.start()
+    ring = None
+    api_server = None
+    if app_config.api_socket is not None:
+        ring = DecisionRing(size=app_config.api_ring_size, journal=journal)
+        api_server = DecisionQueryServer(
+            app_config.api_socket,
+            ring,
+            snapshots=snapshots.cache if snapshots is not None else None,
+            snapshot_kind=snapshots.config.kind if snapshots is not None else "snapshot",
+        )
+        api_server.start()
+
+    rules = RuleEngine(app_config.rules)
+    limiter = DecisionRateLimiter(app_config.rate_limit or RateLimitConfig())
+    correlator = CameraCorrelator(app_config.correlation) if app_config.correlation is not None else None
+    on_event = _on_event_factory(
+        aggregator, lifecycle, state_lock, emit=sinks.emit, journal=journal, ring=ring, metrics=metrics,
+        profiler=profiler, rules=rules, limiter=limiter, correlator=correlator,
+        snapshots=snapshots,
+    )
+    # One adapter (and MQTT connection) per site, all feeding the same pipeline.
+    adapters: Dict[str, FrigateMqttAdapter] = {}
+    for mqtt_config in app_config.connections():
+        if app_config.runtime == "asyncio":
+            adapters[mqtt_config.site] = AsyncFrigateMqttAdapter(
+                mqtt_config=mqtt_config,
+                compact_events=app_config.compact_events,
+                cameras=app_config.cameras,
+                labels=app_config.labels,
+                metrics=metrics,
+                profiler=profiler,
+            )
+        else:
+            adapters[mqtt_config.site] = FrigateMqttAdapter(
+                mqtt_config=mqtt_config,
+                queue_config=app_config.queue,
+                compact_events=app_config.compact_events,
+                cameras=app_config.cameras,
+                labels=app_config.labels,
+                metrics=metrics,
+                profiler=profiler,
+            )
+    if metrics is not None:
+        metrics.registry.gauge_callback(
+            "scc_mqtt_connected", "1 while the site's MQTT connection is up.",
+            lambda: [({"site": site}, float(adapter.connected)) for site, adapter in adapters.items()],
+        )
+        if app_config.queue is not None and app_config.runtime != "asyncio":
+            metrics.registry.gauge_callback(
+                "scc_queue", "Event work queue counters (depth, dropped, queued seconds).",
+                lambda: [
+                    ({"site": site, "stat": key}, value)
+                    for site, adapter in adapters.items()
+                    for key, value in (adapter.queue_stats() or {}).items()
+                ],
+            )
+
+    ingest: Callable[[AnyEvent], None] = on_event
+    if app_config.backfill is not None:
+        # Live events wait in the gate until history has been seeded.
+        gate = LiveGate(on_event)
+        ingest = gate
+        _start_backfill(
+            app_config.backfill, adapters, _seed_factory(aggregator, lifecycle, state_lock, correlator), gate
+        )
+
+    watcher = None
+    if config_path is not None and app_config.reload_poll_seconds > 0:
+        watcher = ConfigWatcher(
+            config_path,
+            app_config,
+            _config_reloader(aggregator, lifecycle, state_lock, adapters, rules, limiter),
+            poll_seconds=app_config.reload_poll_seconds,
+        )
+        watcher.start()
+
+    try:
+        if app_config.runtime == "asyncio":
+            asyncio.run(_run_async(list(adapters.values()), ingest))  # type: ignore[arg-type]
+        else:
+            run_adapters(list(adapters.values()), ingest, stop_event)
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        if snapshotter is not None:
+            snapshotter.stop()
+        if api_server is not None:
+            api_server.stop()
+        if snapshots is not None:
+            snapshots.close()
+            logging.info("Snapshot fetcher closed", extra=snapshots.stats())
+        if journal is not None:
+            journal.close()
 
 
 if __name__ == "__main__":
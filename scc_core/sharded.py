@@ -0,0 +1,293 @@
+"""Camera-partitioned multi-process runner for SCC.
+
+The ingest process keeps the MQTT connection and does no JSON work: it peeks
+the camera name out of each raw payload and routes the bytes to one of N
+worker processes by a stable hash of ``camera_id``. Each worker owns its own
+lifecycle tracker and :class:`~scc_core.dedupe.DedupeAggregator` (incident
+keys never span cameras, so shards are independent) and runs the normal
+decode/normalize/dedupe path. Emitted decisions flow back to a merge thread
+that writes them to the sink in timestamp order, holding each one for a short
+reorder delay so slightly late decisions from other shards can slot in ahead.
+Per-camera rate limits run in the workers; the global cap runs once, in the
+merge thread.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import multiprocessing as mp
+import queue
+import signal
+import threading
+import time
+import zlib
+from dataclasses import replace
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import paho.mqtt.client as mqtt
+
+from scc_core.adapters import FrigateMqttAdapter, MqttConfig, run_adapters
+from scc_core.config import AppConfig
+from scc_core.correlation import CameraCorrelator, CorrelationConfig, camera_groups
+from scc_core.dedupe import AdaptiveWindow, DedupeAggregator
+from scc_core.events import AnyEvent, event_epoch
+from scc_core.lifecycle import FrigateLifecycleTracker
+from scc_core.metrics import SccMetrics
+from scc_core.ratelimit import DecisionRateLimiter, RateLimitConfig
+from scc_core.rules import RuleEngine, RulesConfig
+
+logger = logging.getLogger(__name__)
+
+_Decision = Tuple[float, bytes]
+# Bucket key for the merger's limiter, which only has the global bucket.
+_ALL_SHARDS = "*"
+
+
+def shard_for(camera_id: Optional[str], shards: int, groups: Optional[Dict[str, str]] = None) -> int:
+    """Stable (process-independent) shard index for a camera.
+
+    Cameras in the same correlation ``groups`` component share a shard.
+    """
+
+    if not camera_id:
+        return 0
+    if groups:
+        camera_id = groups.get(camera_id, camera_id)
+    return zlib.crc32(camera_id.encode("utf-8")) % shards
+
+
+class _RoutingAdapter(FrigateMqttAdapter):
+    """Frigate adapter that forwards raw payloads to shard queues instead of normalizing."""
+
+    def __init__(
+        self,
+        mqtt_config: MqttConfig,
+        inboxes: List["mp.Queue[Any]"],
+        cameras: Optional[FrozenSet[str]] = None,
+        labels: Optional[FrozenSet[str]] = None,
+        metrics: Optional[SccMetrics] = None,
+        groups: Optional[Dict[str, str]] = None,
+    ):
+        super().__init__(mqtt_config=mqtt_config, cameras=cameras, labels=labels, metrics=metrics)
+        self._inboxes = inboxes
+        self._groups = groups
+
+    def _on_message(self, client: mqtt.Client, userdata: Any, msg: mqtt.MQTTMessage) -> None:
+        site = self._config.site
+        if self._metrics is not None:
+            self._metrics.messages_received.labels(site).inc()
+        if not self._prefilter(msg.payload):
+            self.rejected_messages += 1
+            if self._metrics is not None:
+                self._metrics.messages_rejected.labels(site).inc()
+            return
+        prefix = self._config.camera_prefix
+        camera = self._peek_camera(msg.payload)
+        shard = shard_for(prefix + camera if camera is not None else None, len(self._inboxes), self._groups)
+        self._inboxes[shard].put((prefix, msg.topic, bytes(msg.payload)))
+
+
+def _worker_main(
+    index: int,
+    inbox: "mp.Queue[Any]",
+    outbox: "mp.Queue[Any]",
+    window_seconds: int,
+    windows: Dict[str, float],
+    adaptive: Optional[AdaptiveWindow],
+    rate_limit: Optional[RateLimitConfig],
+    lifecycle_tracking: bool,
+    suppress_stationary: bool,
+    min_score_gain: float,
+    zone_keys: bool,
+    correlation: Optional[CorrelationConfig],
+    rules_config: RulesConfig,
+    compact_events: bool,
+    cameras: Optional[FrozenSet[str]],
+    labels: Optional[FrozenSet[str]],
+) -> None:
+    # The parent owns shutdown; it drains workers with a sentinel.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    aggregator = DedupeAggregator(window_seconds=window_seconds, windows=windows, adaptive=adaptive, zone_keys=zone_keys)
+    # Each camera lives on exactly one shard, so per-camera buckets are exact; the merger applies the global cap.
+    limiter = DecisionRateLimiter(rate_limit) if rate_limit is not None else None
+    lifecycle = (
+        FrigateLifecycleTracker(min_score_gain=min_score_gain, suppress_stationary=suppress_stationary)
+        if lifecycle_tracking
+        else None
+    )
+    # Linked cameras are routed to the same shard, so correlation sees every neighbor.
+    correlator = CameraCorrelator(correlation) if correlation is not None else None
+    # Rules only look at a decision's camera, type and time, so every shard can evaluate its own.
+    rules = RuleEngine(rules_config)
+    # One normalizing adapter per site camera prefix, created on first use.
+    adapters: Dict[str, FrigateMqttAdapter] = {}
+
+    def _on_event(event: AnyEvent) -> None:
+        material = lifecycle.observe(event) if lifecycle else True
+        if correlator is not None and correlator.observe(event):
+            material = False
+        decision = aggregator.process(event) if material else None
+        actions = None
+        if decision and material:
+            actions = rules.evaluate(
+                decision.camera_id, decision.event_type, event_epoch(decision), decision.meta.get("event_id")
+            )
+            if actions.suppress:
+                material = False
+        if decision and material and limiter is not None:
+            material = limiter.allow(decision.camera_id, time.time())
+        if decision and material:
+            outbox.put((event_epoch(decision), actions.annotate(decision.summary_json())))
+
+    while True:
+        item = inbox.get()
+        if item is None:
+            break
+        prefix, topic, raw = item
+        adapter = adapters.get(prefix)
+        if adapter is None:
+            adapter = adapters[prefix] = FrigateMqttAdapter(
+                mqtt_config=MqttConfig(host=f"shard-{index}", camera_prefix=prefix),
+                compact_events=compact_events,
+                cameras=cameras,
+                labels=labels,
+            )
+            adapter._on_event = _on_event
+        adapter._handle_payload(topic, raw)
+
+
+class DecisionMerger:
+    """Reorder decisions from several shards by timestamp before writing them.
+
+    ``limiter`` enforces ``global_rate_per_minute`` across all shards on the
+    merged stream; it should carry no per-camera rates.
+    """
+
+    def __init__(
+        self,
+        outbox: "mp.Queue[Any]",
+        sink: Callable[[bytes], None],
+        reorder_seconds: float = 0.25,
+        limiter: Optional[DecisionRateLimiter] = None,
+    ):
+        self._outbox = outbox
+        self._sink = sink
+        self._reorder = reorder_seconds
+        self._limiter = limiter
+        self._heap: List[Tuple[float, int, float, bytes]] = []
+        self._seq = itertools.count()
+        self._thread = threading.Thread(target=self._run, name="scc-decision-merge", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def join(self) -> None:
+        self._thread.join()
+
+    def _run(self) -> None:
+        done = False
+        while not done:
+            try:
+                item = self._outbox.get(timeout=self._reorder / 2 or 0.05)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                done = True
+            elif item:
+                ts, line = item
+                heapq.heappush(self._heap, (ts, next(self._seq), time.monotonic(), line))
+            self._release(flush=done)
+
+    def _release(self, flush: bool) -> None:
+        cutoff = time.monotonic() - self._reorder
+        while self._heap and (flush or self._heap[0][2] <= cutoff):
+            _, _, _, line = heapq.heappop(self._heap)
+            if self._limiter is not None and not self._limiter.allow(_ALL_SHARDS, time.time()):
+                continue
+            try:
+                self._sink(line)
+            except Exception:  # noqa: BLE001
+                logger.exception("Failed to write decision")
+
+
+def run_sharded(
+    app_config: AppConfig,
+    workers: int,
+    sink: Callable[[bytes], None],
+    stop_event: threading.Event,
+    metrics: Optional[SccMetrics] = None,
+) -> None:
+    """Run ingest in this process and dedupe in ``workers`` camera-sharded processes.
+
+    Only ingest-side metrics (received/rejected) are recorded here; shard processes keep none.
+    """
+
+    rate_limit = app_config.rate_limit
+    shard_limit = global_limiter = None
+    if rate_limit is not None:
+        # Summing per-shard global buckets would allow N times the configured rate.
+        shard_limit = replace(rate_limit, global_rate_per_minute=0.0)
+        if rate_limit.global_rate_per_minute > 0:
+            global_limiter = DecisionRateLimiter(replace(rate_limit, rate_per_minute=0.0, cameras={}))
+
+    ctx = mp.get_context("spawn")
+    inboxes = [ctx.Queue(maxsize=10_000) for _ in range(workers)]
+    outbox = ctx.Queue()
+    processes = [
+        ctx.Process(
+            target=_worker_main,
+            args=(
+                index,
+                inboxes[index],
+                outbox,
+                app_config.dedupe_window_seconds,
+                app_config.dedupe_windows,
+                app_config.dedupe_adaptive,
+                shard_limit,
+                app_config.lifecycle_tracking,
+                app_config.suppress_stationary,
+                app_config.min_score_gain,
+                app_config.dedupe_zone_keys,
+                app_config.correlation,
+                app_config.rules,
+                app_config.compact_events,
+                app_config.cameras,
+                app_config.labels,
+            ),
+            name=f"scc-shard-{index}",
+            daemon=True,
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    merger = DecisionMerger(outbox, sink, reorder_seconds=app_config.shard_reorder_seconds, limiter=global_limiter)
+    merger.start()
+    logger.info("Started camera-sharded workers", extra={"workers": workers})
+
+    groups = camera_groups(app_config.correlation) if app_config.correlation is not None else None
+    adapters: List[FrigateMqttAdapter] = [
+        _RoutingAdapter(
+            mqtt_config,
+            inboxes,
+            cameras=app_config.cameras,
+            labels=app_config.labels,
+            metrics=metrics,
+            groups=groups,
+        )
+        for mqtt_config in app_config.connections()
+    ]
+    try:
+        run_adapters(adapters, lambda event: None, stop_event)
+    finally:
+        for inbox in inboxes:
+            inbox.put(None)
+        for process in processes:
+            process.join()
+        outbox.put(None)
+        merger.join()
@@ -0,0 +1,344 @@
+"""Buffered decision sinks.
+
+Every sink owns a bounded buffer and a background writer thread. ``emit`` only
+appends to the buffer, so a slow or failing sink can never block ingest; when
+a buffer is full the oldest line is dropped and counted. The writer flushes in
+batches ("group commit") once ``batch_size`` lines are waiting or
+``flush_interval`` seconds have passed.
+"""
+
+from __future__ import annotations
+
+import http.client
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import paho.mqtt.client as mqtt
+
+from scc_core.adapters.frigate_mqtt import MqttConfig
+from scc_core.profiling import StageProfiler
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SinkConfig:
+    kind: str
+    batch_size: int = 100
+    flush_interval: float = 0.1
+    max_backlog: int = 10_000
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+class BufferedSink:
+    """Base class: subclasses implement :meth:`write_batch` (and optionally :meth:`close_resources`)."""
+
+    kind = "base"
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval: float = 0.1,
+        max_backlog: int = 10_000,
+        profiler: Optional[StageProfiler] = None,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backlog = max_backlog
+        self._profiler = profiler
+        self._buffer: Deque[Tuple[float, bytes]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._emitted = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed_batches = 0
+        self._flush_seconds_last = 0.0
+        self._latency_seconds_total = 0.0
+        self._latency_seconds_max = 0.0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name=f"scc-sink-{self.kind}", daemon=True)
+        self._thread.start()
+
+    def emit(self, line: bytes) -> None:
+        """Queue one serialized decision (without trailing newline). Never blocks on I/O."""
+
+        with self._cond:
+            if len(self._buffer) >= self.max_backlog:
+                self._buffer.popleft()
+                self._dropped += 1
+            self._buffer.append((time.monotonic(), line))
+            self._emitted += 1
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Flush what is buffered, stop the writer and release resources."""
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        try:
+            self.close_resources()
+        except Exception:  # noqa: BLE001
+            logger.exception("Failed to close sink", extra={"sink": self.kind})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "sink": self.kind,
+                "backlog": len(self._buffer),
+                "emitted": self._emitted,
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed_batches": self._failed_batches,
+                "flush_seconds_last": self._flush_seconds_last,
+                "latency_seconds_avg": self._latency_seconds_total / self._written if self._written else 0.0,
+                "latency_seconds_max": self._latency_seconds_max,
+            }
+
+    def write_batch(self, lines: List[bytes]) -> None:
+        raise NotImplementedError
+
+    def close_resources(self) -> None:
+        pass
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._buffer) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if not self._buffer:
+                    if self._closed:
+                        return
+                    continue
+                count = min(len(self._buffer), self.batch_size)
+                batch = [self._buffer.popleft() for _ in range(count)]
+
+            started = time.monotonic()
+            try:
+                self.write_batch([line for _, line in batch])
+                ok = True
+            except Exception:  # noqa: BLE001
+                logger.exception("Sink write failed; dropping batch", extra={"sink": self.kind, "lines": len(batch)})
+                ok = False
+            finished = time.monotonic()
+            if ok and self._profiler is not None:
+                self._profiler.record("write", finished - started)
+
+            with self._cond:
+                self._flush_seconds_last = finished - started
+                if not ok:
+                    self._failed_batches += 1
+                    self._dropped += len(batch)
+                    continue
+                self._written += len(batch)
+                for enqueued_at, _ in batch:
+                    latency = finished - enqueued_at
+                    self._latency_seconds_total += latency
+                    if latency > self._latency_seconds_max:
+                        self._latency_seconds_max = latency
+
+
+class StdoutSink(BufferedSink):
+    kind = "stdout"
+
+    def write_batch(self, lines: List[bytes]) -> None:
+        out = sys.stdout.buffer
+        out.write(b"\n".join(lines) + b"\n")
+        out.flush()
+
+
+class JsonlFileSink(BufferedSink):
+    """Append decisions to a JSONL file, rotating to ``<path>.1..N`` past ``max_bytes``."""
+
+    kind = "file"
+
+    def __init__(self, path: Path, max_bytes: int = 10 * 1024 * 1024, backups: int = 5, fsync: bool = False, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.path = Path(path).expanduser()
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.fsync = fsync
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.path, "ab")
+
+    def write_batch(self, lines: List[bytes]) -> None:
+        data = b"\n".join(lines) + b"\n"
+        if self.max_bytes and self._fh.tell() + len(data) > self.max_bytes and self._fh.tell() > 0:
+            self._rotate()
+        self._fh.write(data)
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+
+    def _rotate(self) -> None:
+        self._fh.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backups > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self._fh = open(self.path, "ab")
+
+    def close_resources(self) -> None:
+        self._fh.close()
+
+
+class MqttRepublishSink(BufferedSink):
+    """Republish decisions to an MQTT topic (default ``scc/decisions``)."""
+
+    kind = "mqtt"
+
+    def __init__(self, mqtt_config: MqttConfig, topic: str = "scc/decisions", qos: int = 0, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.topic = topic
+        self.qos = qos
+        self._client = mqtt.Client(client_id=f"{mqtt_config.client_id or 'scc'}-decisions")
+        if mqtt_config.username:
+            self._client.username_pw_set(mqtt_config.username, mqtt_config.password)
+        self._client.reconnect_delay_set(min_delay=1, max_delay=30)
+        self._client.connect_async(mqtt_config.host, mqtt_config.port)
+        self._client.loop_start()
+
+    def write_batch(self, lines: List[bytes]) -> None:
+        for line in lines:
+            self._client.publish(self.topic, line, qos=self.qos)
+
+    def close_resources(self) -> None:
+        self._client.disconnect()
+        self._client.loop_stop()
+
+
+class WebhookSink(BufferedSink):
+    """POST each batch as newline-delimited JSON over a persistent HTTP connection."""
+
+    kind = "webhook"
+
+    def __init__(self, url: str, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        parts = urlsplit(url)
+        if parts.scheme not in {"http", "https"}:
+            raise ValueError(f"Unsupported webhook URL {url!r}")
+        self._scheme = parts.scheme
+        self._netloc = parts.netloc
+        self._path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.timeout = timeout
+        self._headers = {"Content-Type": "application/x-ndjson", **(headers or {})}
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            factory = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            self._conn = factory(self._netloc, timeout=self.timeout)
+        return self._conn
+
+    def write_batch(self, lines: List[bytes]) -> None:
+        body = b"\n".join(lines) + b"\n"
+        conn = self._connection()
+        try:
+            try:
+                conn.request("POST", self._path, body=body, headers=self._headers)
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection; retry once on a fresh one.
+                conn.close()
+                conn.request("POST", self._path, body=body, headers=self._headers)
+                response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            # Drop the (possibly half-used) keep-alive connection; the next batch reconnects.
+            conn.close()
+            self._conn = None
+            raise
+        if response.status >= 300:
+            raise RuntimeError(f"Webhook returned HTTP {response.status}")
+
+    def close_resources(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+
+
+class SinkSet:
+    """Fan decisions out to several buffered sinks."""
+
+    def __init__(self, sinks: List[BufferedSink]):
+        self.sinks = sinks
+
+    def start(self) -> None:
+        for sink in self.sinks:
+            sink.start()
+
+    def emit(self, line: bytes) -> None:
+        for sink in self.sinks:
+            sink.emit(line)
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+            logger.info("Sink closed", extra=sink.stats())
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [sink.stats() for sink in self.sinks]
+
+
+def build_sinks(
+    configs: List[SinkConfig], mqtt_config: MqttConfig, profiler: Optional[StageProfiler] = None
+) -> SinkSet:
+    sinks: List[BufferedSink] = []
+    for config in configs:
+        common = {
+            "batch_size": config.batch_size,
+            "flush_interval": config.flush_interval,
+            "max_backlog": config.max_backlog,
+            "profiler": profiler,
+        }
+        options = config.options
+        if config.kind == "stdout":
+            sinks.append(StdoutSink(**common))
+        elif config.kind == "file":
+            sinks.append(
+                JsonlFileSink(
+                    Path(options["path"]),
+                    max_bytes=int(options.get("max_bytes", 10 * 1024 * 1024)),
+                    backups=int(options.get("backups", 5)),
+                    fsync=bool(options.get("fsync", False)),
+                    **common,
+                )
+            )
+        elif config.kind == "mqtt":
+            # Defaults to the ingest broker; host/port point the decision bus elsewhere.
+            sink_mqtt = replace(
+                mqtt_config,
+                host=str(options.get("host", mqtt_config.host)),
+                port=int(options.get("port", mqtt_config.port)),
+            )
+            sinks.append(
+                MqttRepublishSink(
+                    sink_mqtt,
+                    topic=str(options.get("topic", "scc/decisions")),
+                    qos=int(options.get("qos", 0)),
+                    **common,
+                )
+            )
+        elif config.kind == "webhook":
+            sinks.append(WebhookSink(str(options["url"]), timeout=float(options.get("timeout", 5.0)), **common))
+        else:
+            raise ValueError(f"Unknown sink kind {config.kind!r}")
+    return SinkSet(sinks)
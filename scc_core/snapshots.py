@@ -0,0 +1,343 @@
+"""Frigate snapshots for emitted decisions.
+
+``SnapshotFetcher`` takes emitted decisions (never raw events), skips those
+without a Frigate event id, and hands the rest to a small pool of worker
+threads. Frigate keeps improving an event's snapshot while the object is in
+view, so a cached event is fetched again when a decision reports a higher
+score and once more on its ``end`` decision; otherwise it is not refetched. Each worker keeps one keep-alive HTTP connection to
+Frigate and fetches ``/api/events/<id>/snapshot.jpg`` (or ``thumbnail.jpg``)
+with a per-request timeout. ``submit`` never blocks: when the pending queue is
+full the request is dropped and counted.
+
+``SnapshotCache`` stores images content-addressed (``objects/<sha256>.jpg``)
+with one small ref file per event (``refs/<sha1 of key>``) pointing at the
+blob, so identical images are stored once. The total size is capped at
+``max_bytes``; the least recently used blobs (and the refs pointing at them)
+are evicted first. Recency survives restarts through the blob mtimes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import http.client
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Set
+from urllib.parse import quote, urlsplit
+
+from .events import AnyEvent
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("snapshot", "thumbnail")
+# Best score seen per recent snapshot key, used to decide on refetches.
+_SCORE_MEMORY = 4096
+
+
+@dataclass
+class SnapshotConfig:
+    base_url: str = "http://127.0.0.1:5000"
+    kind: str = "snapshot"
+    cache_dir: Path = Path("~/.cache/scc/snapshots")
+    max_bytes: int = 256 * 1024 * 1024
+    timeout: float = 5.0
+    workers: int = 2
+    max_pending: int = 100
+    # Only fetch for these cameras (None = every camera).
+    cameras: Optional[FrozenSet[str]] = None
+
+
+def snapshot_key(event_id: Any, kind: str = "snapshot") -> str:
+    return f"{event_id}/{kind}"
+
+
+class SnapshotCache:
+    """Size-bounded, content-addressed image store with LRU eviction; thread-safe."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory).expanduser()
+        self.max_bytes = max_bytes
+        self._objects = self.directory / "objects"
+        self._refs_dir = self.directory / "refs"
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._refs_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # digest -> size, least recently used first.
+        self._blobs: "OrderedDict[str, int]" = OrderedDict()
+        self._refs: Dict[str, str] = {}
+        self._digest_refs: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._load()
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the cached image for ``key`` (marking it recently used), or None."""
+
+        with self._lock:
+            digest = self._refs.get(_ref_name(key))
+            if digest is None or digest not in self._blobs:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._blobs.move_to_end(digest)
+        path = self._blob_path(digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return self._refs.get(_ref_name(key)) in self._blobs
+
+    def put(self, key: str, data: bytes) -> Path:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        ref = _ref_name(key)
+        with self._lock:
+            if digest not in self._blobs:
+                _write_atomic(path, data)
+                self._blobs[digest] = len(data)
+                self._bytes += len(data)
+            self._blobs.move_to_end(digest)
+            _write_atomic(self._refs_dir / ref, digest.encode("ascii"))
+            previous = self._link(ref, digest)
+            if previous is not None and not self._digest_refs.get(previous):
+                # A refetch replaced the only image this blob was kept for.
+                self._drop_blob(previous)
+            self._evict()
+        return path
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "blobs": len(self._blobs),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evicted": self.evicted,
+            }
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._objects / f"{digest}.jpg"
+
+    def _link(self, ref: str, digest: str) -> Optional[str]:
+        """Point ``ref`` at ``digest``; return the digest it pointed at before, if different."""
+
+        previous = self._refs.get(ref)
+        if previous == digest:
+            previous = None
+        elif previous is not None:
+            self._digest_refs.get(previous, set()).discard(ref)
+        self._refs[ref] = digest
+        self._digest_refs.setdefault(digest, set()).add(ref)
+        return previous
+
+    def _evict(self) -> None:
+        # Keep at least the newest blob even if it alone exceeds the budget.
+        while self._bytes > self.max_bytes and len(self._blobs) > 1:
+            self._drop_blob(next(iter(self._blobs)))
+            self.evicted += 1
+
+    def _drop_blob(self, digest: str) -> None:
+        size = self._blobs.pop(digest, None)
+        if size is None:
+            return
+        self._bytes -= size
+        for ref in self._digest_refs.pop(digest, ()):
+            self._refs.pop(ref, None)
+            _unlink(self._refs_dir / ref)
+        _unlink(self._blob_path(digest))
+
+    def _load(self) -> None:
+        blobs = []
+        for path in self._objects.glob("*.jpg"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            blobs.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, digest, size in sorted(blobs):
+            self._blobs[digest] = size
+            self._bytes += size
+        for path in self._refs_dir.iterdir():
+            if path.name.endswith(".tmp"):
+                _unlink(path)
+                continue
+            digest = path.read_text(encoding="ascii").strip()
+            if digest in self._blobs:
+                self._link(path.name, digest)
+            else:
+                _unlink(path)
+        self._evict()
+
+
+class SnapshotFetcher:
+    """Fetch Frigate snapshots for emitted decisions on background threads."""
+
+    def __init__(self, config: SnapshotConfig, cache: Optional[SnapshotCache] = None):
+        if config.kind not in KINDS:
+            raise ValueError(f"Unknown snapshot kind {config.kind!r}; expected one of {', '.join(KINDS)}")
+        parts = urlsplit(config.base_url)
+        if parts.scheme not in {"http", "https"}:
+            raise ValueError(f"Unsupported Frigate URL {config.base_url!r}")
+        self.config = config
+        self.cache = cache or SnapshotCache(config.cache_dir, config.max_bytes)
+        self._scheme = parts.scheme
+        self._netloc = parts.netloc
+        self._prefix = parts.path.rstrip("/")
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=config.max_pending)
+        # Queued or in-flight keys -> fetch again once done (a better image was reported meanwhile).
+        self._pending: Dict[str, bool] = {}
+        self._scores: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._fetched = 0
+        self._failed = 0
+        self._dropped = 0
+        self._skipped = 0
+
+    def start(self) -> None:
+        for index in range(max(1, self.config.workers)):
+            thread = threading.Thread(target=self._run, name=f"scc-snapshot-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, decision: AnyEvent) -> bool:
+        """Queue a fetch for ``decision``'s event; False when skipped, cached or dropped."""
+
+        event_id = decision.meta.get("event_id")
+        cameras = self.config.cameras
+        if event_id is None or (cameras is not None and decision.camera_id not in cameras):
+            return False
+        key = snapshot_key(event_id, self.config.kind)
+        score = decision.confidence or 0.0
+        with self._lock:
+            best = self._scores.get(key)
+            better = best is None or score > best or decision.meta.get("frigate_type") == "end"
+            if best is None or score > best:
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+                if len(self._scores) > _SCORE_MEMORY:
+                    self._scores.popitem(last=False)
+            if key in self._pending:
+                if better:
+                    self._pending[key] = True
+                self._skipped += 1
+                return False
+            if not better and key in self.cache:
+                self._skipped += 1
+                return False
+            return self._enqueue(key)
+
+    def _enqueue(self, key: str) -> bool:
+        # Called with the lock held.
+        try:
+            self._queue.put_nowait(key)
+        except queue.Full:
+            self._dropped += 1
+            return False
+        self._pending[key] = False
+        return True
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "fetched": self._fetched,
+                "failed": self._failed,
+                "dropped": self._dropped,
+                "skipped": self._skipped,
+                "pending": len(self._pending),
+            }
+        stats.update(self.cache.stats())
+        return stats
+
+    def _path(self, key: str) -> str:
+        event_id, _, kind = key.rpartition("/")
+        return f"{self._prefix}/api/events/{quote(event_id, safe='')}/{kind}.jpg"
+
+    def _connect(self) -> http.client.HTTPConnection:
+        factory = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+        return factory(self._netloc, timeout=self.config.timeout)
+
+    def _run(self) -> None:
+        conn: Optional[http.client.HTTPConnection] = None
+        while True:
+            key = self._queue.get()
+            if key is None:
+                break
+            if conn is None:
+                conn = self._connect()
+            try:
+                data = self._fetch(conn, key)
+            except (OSError, http.client.HTTPException) as exc:
+                # Drop the (possibly half-used) keep-alive connection; the next fetch reconnects.
+                conn.close()
+                conn = None
+                logger.warning("Snapshot fetch failed", extra={"key": key, "error": str(exc)})
+                data = None
+            if data is not None:
+                try:
+                    self.cache.put(key, data)
+                except OSError:
+                    logger.exception("Failed to cache snapshot", extra={"key": key})
+                    data = None
+            with self._lock:
+                again = self._pending.pop(key, False)
+                if data is None:
+                    self._failed += 1
+                else:
+                    self._fetched += 1
+                if again:
+                    self._enqueue(key)
+        if conn is not None:
+            conn.close()
+
+    def _fetch(self, conn: http.client.HTTPConnection, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # The server closed an idle keep-alive connection; retry once on a fresh one.
+            conn.close()
+            conn.request("GET", path)
+            response = conn.getresponse()
+        data = response.read()
+        if response.status != 200:
+            # The body was read in full, so the connection stays usable.
+            logger.warning("Frigate has no snapshot", extra={"key": key, "status": response.status})
+            return None
+        return data
+
+
+def _ref_name(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp, path)
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Optional
+
+from .dedupe import DedupeAggregator
+from .lifecycle import FrigateLifecycleTracker
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+class StateSnapshotter:
+    """Periodically persist dedupe and lifecycle state so restarts do not re-announce.
+
+    Snapshots are written to a temporary file in the target directory, fsynced
+    and then ``os.replace``-d over the previous one, so a crash mid-write always
+    leaves either the old or the new snapshot intact. The directory is fsynced
+    after the rename so the new snapshot is durable, not just complete.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        aggregator: DedupeAggregator,
+        lifecycle: Optional[FrigateLifecycleTracker] = None,
+        interval_seconds: float = 30.0,
+        lock: Optional[threading.Lock] = None,
+        compact_events: bool = False,
+    ):
+        self.path = Path(path)
+        self._aggregator = aggregator
+        self._lifecycle = lifecycle
+        self._interval = interval_seconds
+        self._lock = lock
+        self._compact_events = compact_events
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _guard(self) -> ContextManager[Any]:
+        return self._lock if self._lock is not None else nullcontext()
+
+    def restore(self, now: Optional[float] = None) -> int:
+        """Load the last snapshot, dropping incidents older than the dedupe window."""
+
+        try:
+            data = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable state snapshot", extra={"path": str(self.path)}, exc_info=True)
+            return 0
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            logger.warning("Ignoring state snapshot with unknown version", extra={"path": str(self.path)})
+            return 0
+
+        now = time.time() if now is None else now
+        with self._guard():
+            restored = self._aggregator.restore_state(
+                data.get("incidents", ()), now=now, compact=self._compact_events
+            )
+            if self._lifecycle is not None:
+                self._lifecycle.restore_state(data.get("lifecycle", ()), now=now)
+        logger.info("Restored dedupe state", extra={"incidents": restored, "path": str(self.path)})
+        return restored
+
+    def save(self) -> None:
+        with self._guard():
+            data: Dict[str, Any] = {
+                "version": SNAPSHOT_VERSION,
+                "saved_at": time.time(),
+                "incidents": self._aggregator.export_state(),
+                "lifecycle": self._lifecycle.export_state() if self._lifecycle is not None else [],
+            }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{self.path.name}.", dir=str(self.path.parent))
+        try:
+            with os.fdopen(fd, "w") as fh:
+                json.dump(data, fh, separators=(",", ":"))
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+        _fsync_dir(self.path.parent)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="scc-state-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the periodic writer and take a final snapshot."""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._save_logged()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self._save_logged()
+
+    def _save_logged(self) -> None:
+        try:
+            self.save()
+        except Exception:  # noqa: BLE001
+            logger.exception("Failed to write state snapshot", extra={"path": str(self.path)})
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Flush the directory entry so the rename itself survives a power loss."""
+
+    fd = os.open(str(directory), os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
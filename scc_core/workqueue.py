@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+from .events import AnyEvent
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop-oldest", "drop-non-frigate")
+
+
+@dataclass
+class QueueConfig:
+    max_size: int = 1000
+    workers: int = 1
+    overflow: str = "block"
+
+
+def _default_key(event: AnyEvent) -> Hashable:
+    return (event.camera_id, event.event_type)
+
+
+class EventWorkQueue:
+    """Bounded hand-off from the MQTT network thread to a pool of event workers.
+
+    Events are sharded across workers by ``key`` (``(camera_id, event_type)`` by
+    default) and each shard is FIFO, so ordering per key is preserved no matter
+    how many workers run. ``max_size`` bounds the total across shards.
+
+    Overflow policies when the queue is full:
+
+    - ``block``: the producer waits for room.
+    - ``drop-oldest``: the oldest queued event (any shard) is discarded.
+    - ``drop-non-frigate``: the oldest queued non-Frigate event is discarded; an
+      incoming non-Frigate event is dropped if there is none, and an incoming
+      Frigate event waits for room rather than being lost.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[AnyEvent], None],
+        config: Optional[QueueConfig] = None,
+        key: Callable[[AnyEvent], Hashable] = _default_key,
+        name: str = "scc-event-worker",
+    ):
+        self._config = config or QueueConfig()
+        if self._config.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {self._config.overflow!r}; expected one of {OVERFLOW_POLICIES}")
+        if self._config.max_size < 1 or self._config.workers < 1:
+            raise ValueError("max_size and workers must be at least 1")
+
+        self._handler = handler
+        self._key = key
+        self._name = name
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        workers = self._config.workers
+        self._shards: List[Deque[Tuple[int, float, AnyEvent]]] = [deque() for _ in range(workers)]
+        self._not_empty = [threading.Condition(self._lock) for _ in range(workers)]
+        self._seq = itertools.count()
+        self._size = 0
+        self._closed = False
+        self._threads: List[threading.Thread] = []
+
+        self._enqueued = 0
+        self._processed = 0
+        self._dropped = 0
+        self._queued_seconds_total = 0.0
+        self._queued_seconds_max = 0.0
+
+    def start(self) -> None:
+        for index in range(len(self._shards)):
+            thread = threading.Thread(target=self._worker, args=(index,), name=f"{self._name}-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def put(self, event: AnyEvent) -> bool:
+        """Queue an event; returns False if it was dropped by the overflow policy."""
+
+        shard = hash(self._key(event)) % len(self._shards)
+        with self._lock:
+            while self._size >= self._config.max_size and not self._closed:
+                if self._config.overflow == "drop-oldest":
+                    self._evict(lambda item: True)
+                    break
+                if self._config.overflow == "drop-non-frigate":
+                    if self._evict(lambda item: item[2].source != "frigate"):
+                        break
+                    if event.source != "frigate":
+                        self._dropped += 1
+                        return False
+                self._not_full.wait()
+            if self._closed:
+                self._dropped += 1
+                return False
+
+            self._shards[shard].append((next(self._seq), time.monotonic(), event))
+            self._size += 1
+            self._enqueued += 1
+            self._not_empty[shard].notify()
+        return True
+
+    def _evict(self, predicate: Callable[[Tuple[int, float, AnyEvent]], bool]) -> bool:
+        """Drop the oldest queued item matching ``predicate``. Caller holds the lock."""
+
+        victim_shard: Optional[Deque[Tuple[int, float, AnyEvent]]] = None
+        victim: Optional[Tuple[int, float, AnyEvent]] = None
+        for shard in self._shards:
+            for item in shard:
+                if predicate(item):
+                    if victim is None or item[0] < victim[0]:
+                        victim_shard, victim = shard, item
+                    # Shards are FIFO, so the first match is the oldest in this shard.
+                    break
+        if victim is None or victim_shard is None:
+            return False
+        victim_shard.remove(victim)
+        self._size -= 1
+        self._dropped += 1
+        return True
+
+    def _worker(self, index: int) -> None:
+        shard = self._shards[index]
+        not_empty = self._not_empty[index]
+        while True:
+            with self._lock:
+                while not shard and not self._closed:
+                    not_empty.wait()
+                if not shard:
+                    return
+                _, enqueued_at, event = shard.popleft()
+                self._size -= 1
+                waited = time.monotonic() - enqueued_at
+                self._queued_seconds_total += waited
+                if waited > self._queued_seconds_max:
+                    self._queued_seconds_max = waited
+                self._not_full.notify()
+
+            try:
+                self._handler(event)
+            except Exception:  # noqa: BLE001
+                logger.exception("Failed to handle queued event")
+
+            with self._lock:
+                self._processed += 1
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting events, let workers drain what is queued, and join them."""
+
+        with self._lock:
+            self._closed = True
+            self._not_full.notify_all()
+            for condition in self._not_empty:
+                condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "depth": self._size,
+                "max_size": self._config.max_size,
+                "workers": len(self._shards),
+                "enqueued": self._enqueued,
+                "processed": self._processed,
+                "dropped": self._dropped,
+                "queued_seconds_total": self._queued_seconds_total,
+                "queued_seconds_max": self._queued_seconds_max,
+            }
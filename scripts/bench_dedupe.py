@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: DedupeAggregator events/sec against the number of live incidents.
+
+Each run seeds N live incidents (distinct camera/label keys) and then replays a
+stream of Frigate ``update`` events that keep refreshing them, which is the
+shape of the per-message load once every camera has an active object. The
+full-scan ``_purge`` the aggregator used before the expiry heap is included as
+a baseline so the two can be compared on the same machine. Expect the two to
+be about even (either may win) at ~10 live incidents; the heap only pulls
+ahead as the count grows.
+
+Usage: python scripts/bench_dedupe.py [--events 50000] [--sizes 10,100,1000,5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from scc_core.dedupe import DedupeAggregator
+from scc_core.events import Event
+
+
+class FullScanDedupeAggregator(DedupeAggregator):
+    """Baseline: walk every incident on each event (pre-heap behaviour)."""
+
+    def _purge(self, now: float) -> None:
+        expired_keys = [
+            key
+            for key, inc in self._incidents.items()
+            if now - inc.last_updated > inc.window
+        ]
+        for key in expired_keys:
+            del self._incidents[key]
+
+
+def _make_events(live: int, count: int) -> List[Event]:
+    base = datetime(2026, 1, 8, 10, 0, tzinfo=timezone.utc)
+    step = timedelta(milliseconds=5)
+    return [
+        Event(
+            source="frigate",
+            camera_id=f"cam{(i % live) // 4}",
+            event_type=f"label{(i % live) % 4}",
+            ts=base + step * i,
+            confidence=0.8,
+        )
+        for i in range(count)
+    ]
+
+
+def _run(factory, events: List[Event], window_seconds: int) -> float:
+    aggregator = factory(window_seconds=window_seconds)
+    process = aggregator.process
+    started = time.perf_counter()
+    for event in events:
+        process(event)
+    elapsed = time.perf_counter() - started
+    return len(events) / elapsed if elapsed else float("inf")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50_000, help="Events per run")
+    parser.add_argument("--sizes", default="10,100,1000,5000", help="Comma-separated live incident counts")
+    parser.add_argument("--window", type=int, default=3600, help="Dedupe window in seconds")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    print(f"{'live':>8} {'heap ev/s':>14} {'full-scan ev/s':>16} {'speedup':>9}")
+    for live in sizes:
+        events = _make_events(live, args.events)
+        heap_rate = _run(DedupeAggregator, events, args.window)
+        scan_rate = _run(FullScanDedupeAggregator, events, args.window)
+        print(f"{live:>8} {heap_rate:>14,.0f} {scan_rate:>16,.0f} {heap_rate / scan_rate:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-event cost of Event versus CompactEvent.
+
+Normalizes the same Frigate payloads through ``FrigateMqttAdapter._normalize_event``
+into each representation, runs them through ``DedupeAggregator.process`` and
+serializes every emitted decision the way ``run_scc`` does. Reports wall time
+per event, and bytes held per live normalized event (tracemalloc).
+
+Usage: python scripts/bench_events.py [--events 50000] [--cameras 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+
+from scc_core.adapters import FrigateMqttAdapter, MqttConfig
+from scc_core.dedupe import DedupeAggregator
+
+
+def _make_payloads(count: int, cameras: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "type": "update",
+            "after": {
+                "id": f"1767866400.{i // 30}-abc",
+                "camera": f"camera_{i % cameras}",
+                "label": "person" if i % 3 else "car",
+                "top_score": 0.8,
+                "frame_time": 1767866400.0 + i * 0.01,
+                "snapshot": None,
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def _run(compact: bool, payloads: List[Dict[str, Any]]) -> float:
+    """Return seconds spent normalizing, deduping and serializing every payload."""
+
+    adapter = FrigateMqttAdapter(mqtt_config=MqttConfig(host="bench"), compact_events=compact)
+    aggregator = DedupeAggregator(window_seconds=15)
+    normalize = adapter._normalize_event
+    process = aggregator.process
+
+    started = time.perf_counter()
+    for payload in payloads:
+        decision = process(normalize(payload))
+        if decision:
+            decision.summary_json()
+    return time.perf_counter() - started
+
+
+def _footprint(compact: bool, payloads: List[Dict[str, Any]]) -> float:
+    """Return bytes allocated per live event for the normalized representation."""
+
+    adapter = FrigateMqttAdapter(mqtt_config=MqttConfig(host="bench"), compact_events=compact)
+    normalize = adapter._normalize_event
+    tracemalloc.start()
+    events = [normalize(payload) for payload in payloads]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / len(events)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--cameras", type=int, default=10)
+    args = parser.parse_args()
+
+    payloads = _make_payloads(args.events, args.cameras)
+    results: Dict[str, Tuple[float, float]] = {}
+    for name, compact in (("Event", False), ("CompactEvent", True)):
+        # Warm up so interning and imports do not count against the measured run.
+        _run(compact, payloads[:1000])
+        elapsed = _run(compact, payloads)
+        results[name] = (elapsed / args.events, _footprint(compact, payloads))
+
+    print(f"{'representation':<16} {'us/event':>10} {'bytes/event':>12}")
+    for name, (per_event, footprint) in results.items():
+        print(f"{name:<16} {per_event * 1e6:>10.2f} {footprint:>12.0f}")
+
+    base, compact = results["Event"], results["CompactEvent"]
+    print(
+        f"\nCompactEvent saves {(base[0] - compact[0]) * 1e6:.2f} us and "
+        f"{base[1] - compact[1]:.0f} bytes per event"
+    )
+
+
+if __name__ == "__main__":
+    main()